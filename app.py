@@ -4,12 +4,19 @@
 专为Streamlit Cloud环境优化，修复ModuleNotFoundError问题
 """
 import os
+import codecs
 import streamlit as st
 import asyncio
 from datetime import datetime
 from typing import Optional, Tuple, Any
 from openai import OpenAI
 
+# 环境变量快照（config模块只导入一次，避免每次重跑都读取环境变量）
+try:
+    from config import API_ENV
+except ImportError:
+    API_ENV = os.environ
+
 # 导入搜索功能
 try:
     from enhanced_search import search_manager
@@ -23,45 +30,53 @@ class APIClientManager:
     """API客户端管理器"""
 
     @staticmethod
-    def create_openai_client() -> Optional[Tuple[OpenAI, str]]:
-        """创建OpenAI客户端"""
-        try:
-            # 检查火山方舟API密钥
-            ark_api_key = None
-            if hasattr(st, 'secrets'):
-                ark_api_key = st.secrets.get("ARK_API_KEY", None)
-            if not ark_api_key:
-                ark_api_key = os.getenv("ARK_API_KEY")
-
-            if ark_api_key and ark_api_key not in ["your_volcano_engine_ark_api_key_here", ""]:
-                # 使用火山方舟API
-                base_url = os.getenv("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3")
-                model = os.getenv("ARK_MODEL", "ep-20250506230532-w7rdw")
-
-                if hasattr(st, 'secrets'):
-                    base_url = st.secrets.get("ARK_BASE_URL", base_url)
-                    model = st.secrets.get("ARK_MODEL", model)
-
-                client = OpenAI(
-                    api_key=ark_api_key,
-                    base_url=base_url
-                )
-                return client, model
+    def get_api_config() -> Optional[Tuple[str, Optional[str], str]]:
+        """读取API配置，返回(api_key, base_url, model)"""
+        # 检查火山方舟API密钥
+        ark_api_key = None
+        if hasattr(st, 'secrets'):
+            ark_api_key = st.secrets.get("ARK_API_KEY", None)
+        if not ark_api_key:
+            ark_api_key = API_ENV.get("ARK_API_KEY")
+
+        if ark_api_key and ark_api_key not in ["your_volcano_engine_ark_api_key_here", ""]:
+            # 使用火山方舟API
+            base_url = API_ENV.get("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3")
+            model = API_ENV.get("ARK_MODEL", "ep-20250506230532-w7rdw")
 
-            # 检查OpenAI API密钥
-            openai_api_key = None
             if hasattr(st, 'secrets'):
-                openai_api_key = st.secrets.get("OPENAI_API_KEY", None)
-            if not openai_api_key:
-                openai_api_key = os.getenv("OPENAI_API_KEY")
+                base_url = st.secrets.get("ARK_BASE_URL", base_url)
+                model = st.secrets.get("ARK_MODEL", model)
 
-            if openai_api_key and openai_api_key not in ["your_openai_api_key_here", ""]:
-                # 使用OpenAI API
-                client = OpenAI(api_key=openai_api_key)
-                model = "gpt-3.5-turbo"
-                return client, model
+            return ark_api_key, base_url, model
 
-            return None
+        # 检查OpenAI API密钥
+        openai_api_key = None
+        if hasattr(st, 'secrets'):
+            openai_api_key = st.secrets.get("OPENAI_API_KEY", None)
+        if not openai_api_key:
+            openai_api_key = API_ENV.get("OPENAI_API_KEY")
+
+        if openai_api_key and openai_api_key not in ["your_openai_api_key_here", ""]:
+            # 使用OpenAI API
+            return openai_api_key, None, "gpt-3.5-turbo"
+
+        return None
+
+    @staticmethod
+    def create_openai_client() -> Optional[Tuple[OpenAI, str]]:
+        """创建OpenAI客户端"""
+        try:
+            config = APIClientManager.get_api_config()
+            if not config:
+                return None
+
+            api_key, base_url, model = config
+            if base_url:
+                client = OpenAI(api_key=api_key, base_url=base_url)
+            else:
+                client = OpenAI(api_key=api_key)
+            return client, model
 
         except Exception as e:
             st.error(f"创建API客户端失败: {e}")
@@ -152,7 +167,6 @@ class StreamlitUIHelper:
 
                 st.markdown("---")
 
-            st.markdown("#### ✨ 功能特性")
             features = [
                 "💬 智能对话交流",
                 "📁 文件内容分析",
@@ -163,8 +177,8 @@ class StreamlitUIHelper:
             if SEARCH_AVAILABLE:
                 features.insert(1, "🌐 联网实时搜索")
 
-            for feature in features:
-                st.markdown(f"- {feature}")
+            # 合并为一次渲染，减少前端消息数量
+            st.markdown("\n".join(["#### ✨ 功能特性", *(f"- {feature}" for feature in features)]))
 
             st.markdown("#### 📊 使用统计")
             if 'chat_count' not in st.session_state:
@@ -179,8 +193,6 @@ class StreamlitUIHelper:
                 if SEARCH_AVAILABLE:
                     st.metric("搜索次数", st.session_state.search_count)
 
-            st.markdown("---")
-            st.markdown("#### 💡 使用提示")
             tips = [
                 "直接输入问题开始对话",
                 "上传文件进行AI分析",
@@ -190,13 +202,41 @@ class StreamlitUIHelper:
             if SEARCH_AVAILABLE:
                 tips.insert(1, "询问最新信息会自动搜索")
 
-            for tip in tips:
-                st.markdown(f"- {tip}")
+            st.markdown("\n".join(["---", "#### 💡 使用提示", *(f"- {tip}" for tip in tips)]))
 
 
 class FileProcessor:
     """文件处理器"""
 
+    # AI处理只使用文件开头的这部分内容
+    MAX_CONTENT_CHARS = 4000
+    READ_CHUNK_SIZE = 64 * 1024
+
+    @staticmethod
+    def read_text_prefix(uploaded_file, max_chars: int) -> Tuple[str, bool]:
+        """
+        分块解码文件开头的文本
+
+        Returns:
+            (最多max_chars个字符的内容, 是否已读完整个文件)
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        parts = []
+        length = 0
+
+        # 多读一个字符以判断文件是否被截断
+        while length <= max_chars:
+            chunk = uploaded_file.read(FileProcessor.READ_CHUNK_SIZE)
+            if not chunk:
+                parts.append(decoder.decode(b'', final=True))
+                return "".join(parts), True
+
+            text = decoder.decode(chunk)
+            parts.append(text)
+            length += len(text)
+
+        return "".join(parts)[:max_chars], False
+
     @staticmethod
     def show_file_info(uploaded_file):
         """显示文件信息"""
@@ -212,25 +252,34 @@ class FileProcessor:
 
     @staticmethod
     def process_text_file(content: str, client: OpenAI, model: str, action: str):
-        """处理文本文件"""
+        """处理文本文件（流式显示结果）"""
         try:
-            with st.spinner(f"正在{action}文件内容..."):
-                if action == "总结":
-                    prompt = f"请总结以下内容的主要要点：\n\n{content[:4000]}"
-                else:  # 分析
-                    prompt = f"请分析以下内容的结构、主题和关键信息：\n\n{content[:4000]}"
+            excerpt = content[:FileProcessor.MAX_CONTENT_CHARS]
+            if action == "总结":
+                prompt = f"请总结以下内容的主要要点：\n\n{excerpt}"
+            else:  # 分析
+                prompt = f"请分析以下内容的结构、主题和关键信息：\n\n{excerpt}"
 
+            st.markdown(f"#### 🎯 {action}结果")
+            result_placeholder = st.empty()
+
+            with st.spinner(f"正在{action}文件内容..."):
                 response = client.chat.completions.create(
                     model=model,
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=1000,
-                    temperature=0.7
+                    temperature=0.7,
+                    stream=True
                 )
 
-                result = response.choices[0].message.content
+            # 首个token到达即开始渲染，不必等待完整回复
+            result = ""
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    result += chunk.choices[0].delta.content
+                    result_placeholder.markdown(result + "▌")
 
-                st.markdown(f"#### 🎯 {action}结果")
-                st.markdown(result)
+            result_placeholder.markdown(result)
 
         except Exception as e:
             st.error(f"处理文件时出错: {e}")
@@ -239,6 +288,17 @@ class FileProcessor:
 class ChatManager:
     """聊天管理器"""
 
+    # 会话中保留的最大消息数，避免session_state随对话无限增长
+    MAX_HISTORY_MESSAGES = 40
+
+    @staticmethod
+    def append_message(role: str, content: str):
+        """添加消息到历史，超出上限时原地丢弃最早的消息"""
+        messages = st.session_state.messages
+        messages.append({"role": role, "content": content})
+        if len(messages) > ChatManager.MAX_HISTORY_MESSAGES:
+            del messages[:-ChatManager.MAX_HISTORY_MESSAGES]
+
     @staticmethod
     def initialize_chat():
         """初始化聊天"""
@@ -262,7 +322,7 @@ class ChatManager:
 
             请随时向我提问！
             """
-            st.session_state.messages.append({"role": "assistant", "content": welcome_msg})
+            ChatManager.append_message("assistant", welcome_msg)
 
     @staticmethod
     def display_chat_history():
@@ -275,7 +335,7 @@ class ChatManager:
     def process_user_input(client: OpenAI, model: str, prompt: str):
         """处理用户输入"""
         # 添加用户消息
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        ChatManager.append_message("user", prompt)
         with st.chat_message("user"):
             st.markdown(prompt)
 
@@ -292,10 +352,7 @@ class ChatManager:
 
             except Exception as e:
                 st.error(f"生成回复时出错: {e}")
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": f"抱歉，处理您的请求时出现了错误: {e}"
-                })
+                ChatManager.append_message("assistant", f"抱歉，处理您的请求时出现了错误: {e}")
 
     @staticmethod
     def _process_with_search(client: OpenAI, model: str, prompt: str):
@@ -329,7 +386,7 @@ class ChatManager:
             response_placeholder.markdown(full_response)
 
             # 添加到历史
-            st.session_state.messages.append({"role": "assistant", "content": full_response})
+            ChatManager.append_message("assistant", full_response)
             st.session_state.chat_count += 1
 
         except Exception as e:
@@ -364,17 +421,37 @@ class ChatManager:
             response_placeholder.markdown(full_response)
 
         # 添加AI回复到历史
-        st.session_state.messages.append({"role": "assistant", "content": full_response})
+        ChatManager.append_message("assistant", full_response)
         st.session_state.chat_count += 1
 
 # 页面配置
 StreamlitUIHelper.setup_page_config()
 
 
+@st.cache_resource(show_spinner=False)
+def create_api_client(api_key: str, base_url: Optional[str], model: str) -> Tuple[OpenAI, str]:
+    """创建进程级共享的API客户端（按配置缓存，脚本重跑时不再重复创建）"""
+    if base_url:
+        return OpenAI(api_key=api_key, base_url=base_url), model
+    return OpenAI(api_key=api_key), model
+
+
+def get_api_client() -> Optional[Tuple[OpenAI, str]]:
+    """获取API客户端（每次重跑都读取配置，未配置密钥的结果不会被缓存）"""
+    try:
+        config = APIClientManager.get_api_config()
+        if not config:
+            return None
+        return create_api_client(*config)
+    except Exception as e:
+        st.error(f"创建API客户端失败: {e}")
+        return None
+
+
 def init_streamlit_client():
     """初始化Streamlit Cloud客户端"""
     # 使用重构后的API客户端管理器
-    result = APIClientManager.create_openai_client()
+    result = get_api_client()
 
     if not result:
         st.error("❌ 未找到API密钥")
@@ -382,16 +459,14 @@ def init_streamlit_client():
         return None
 
     client, model = result
+    api_type = "火山方舟API" if API_ENV.get("ARK_API_KEY") else "OpenAI API"
 
-    # 测试连接
-    if APIClientManager.test_api_connection(client, model):
-        import os
-
-        api_type = "火山方舟API" if os.getenv("ARK_API_KEY") else "OpenAI API"
+    # 测试连接（每个会话成功一次后不再重复测试）
+    if st.session_state.get("api_connection_ok") or APIClientManager.test_api_connection(client, model):
+        st.session_state.api_connection_ok = True
         st.success(f"✅ {api_type}连接成功")
         return client, model
     else:
-        api_type = "火山方舟API" if os.getenv("ARK_API_KEY") else "OpenAI API"
         st.error(f"❌ {api_type}连接测试失败")
         st.info("请检查API密钥是否正确，以及网络连接是否正常")
         return None, None
@@ -436,13 +511,19 @@ def streamlit_file_interface(client, model):
         # 处理文本文件
         if uploaded_file.type.startswith('text/') or uploaded_file.name.endswith('.md'):
             try:
-                content = uploaded_file.read().decode('utf-8')
+                # 只解码预览和AI处理需要的前缀，避免大文件整体读入内存
+                content, complete = FileProcessor.read_text_prefix(
+                    uploaded_file, FileProcessor.MAX_CONTENT_CHARS
+                )
 
                 # 文件预览
                 st.markdown("#### 👀 文件预览")
-                if len(content) > 1000:
+                if len(content) > 1000 or not complete:
                     st.text_area("内容预览", content[:1000] + "...", height=150, disabled=True)
-                    st.caption(f"显示前1000字符，总长度: {len(content)}字符")
+                    if complete:
+                        st.caption(f"显示前1000字符，总长度: {len(content)}字符")
+                    else:
+                        st.caption(f"显示前1000字符，AI处理将使用前{FileProcessor.MAX_CONTENT_CHARS}字符")
                 else:
                     st.text_area("文件内容", content, height=150, disabled=True)
 
@@ -21,6 +21,7 @@ class CodeQualityAnalyzer:
         self.issues = defaultdict(list)
         self.duplicate_files = []
         self.unused_imports = defaultdict(list)
+        self._file_cache = None
         
     def scan_project(self):
         """扫描项目文件"""
@@ -32,6 +33,38 @@ class CodeQualityAnalyzer:
                 self.python_files.append(file_path)
         
         print(f"📁 找到 {len(self.python_files)} 个Python文件")
+    
+    def _load_files(self):
+        """读取并解析所有文件（每个文件只读取、解析一次），各项分析共用结果"""
+        if self._file_cache is None:
+            self._file_cache = [self._load_file(file_path) for file_path in self.python_files]
+        return self._file_cache
+    
+    @staticmethod
+    def _load_file(file_path):
+        """读取单个文件，返回内容、各行（不含换行符）、语法树以及读取或解析时的错误"""
+        loaded = {"path": file_path, "content": None, "lines": [], "tree": None, "error": None}
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            loaded["error"] = e
+            return loaded
+        
+        # 文本模式读取已统一换行符；与readlines()一致，末尾换行符之后不再计为一行
+        lines = content.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        loaded["content"] = content
+        loaded["lines"] = lines
+        
+        try:
+            loaded["tree"] = ast.parse(content)
+        except Exception as e:
+            loaded["error"] = e
+        
+        return loaded
         
     def analyze_duplicate_files(self):
         """分析重复文件"""
@@ -63,39 +96,35 @@ class CodeQualityAnalyzer:
         """分析未使用的导入"""
         print("\n🔍 分析未使用的导入...")
         
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                tree = ast.parse(content)
-                
-                # 收集导入的模块
-                imports = set()
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.Import):
-                        for alias in node.names:
-                            imports.add(alias.name.split('.')[0])
-                    elif isinstance(node, ast.ImportFrom):
-                        if node.module:
-                            imports.add(node.module.split('.')[0])
-                        for alias in node.names:
-                            imports.add(alias.name)
-                
-                # 检查是否使用了导入的模块
-                unused = []
-                for imp in imports:
-                    if imp not in content.replace(f"import {imp}", "").replace(f"from {imp}", ""):
-                        # 简单检查，可能有误报
-                        pattern = rf'\b{re.escape(imp)}\b'
-                        if not re.search(pattern, content.replace(f"import {imp}", "").replace(f"from {imp}", "")):
-                            unused.append(imp)
-                
-                if unused:
-                    self.unused_imports[str(file_path)] = unused
-                    
-            except Exception as e:
-                print(f"⚠️ 分析文件 {file_path} 时出错: {e}")
+        for loaded in self._load_files():
+            file_path, content, tree = loaded["path"], loaded["content"], loaded["tree"]
+            if tree is None:
+                print(f"⚠️ 分析文件 {file_path} 时出错: {loaded['error']}")
+                continue
+            
+            # 收集导入的模块
+            imports = set()
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    for alias in node.names:
+                        imports.add(alias.name.split('.')[0])
+                elif isinstance(node, ast.ImportFrom):
+                    if node.module:
+                        imports.add(node.module.split('.')[0])
+                    for alias in node.names:
+                        imports.add(alias.name)
+            
+            # 检查是否使用了导入的模块
+            unused = []
+            for imp in imports:
+                if imp not in content.replace(f"import {imp}", "").replace(f"from {imp}", ""):
+                    # 简单检查，可能有误报
+                    pattern = rf'\b{re.escape(imp)}\b'
+                    if not re.search(pattern, content.replace(f"import {imp}", "").replace(f"from {imp}", "")):
+                        unused.append(imp)
+            
+            if unused:
+                self.unused_imports[str(file_path)] = unused
     
     def analyze_code_complexity(self):
         """分析代码复杂度"""
@@ -103,39 +132,37 @@ class CodeQualityAnalyzer:
         
         complex_files = []
         
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                # 检查文件长度
-                if len(lines) > 500:
-                    complex_files.append({
-                        "file": str(file_path),
-                        "lines": len(lines),
-                        "issue": "文件过长",
-                        "suggestion": "考虑拆分为多个模块"
-                    })
-                
-                # 检查函数长度
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                tree = ast.parse(content)
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.FunctionDef):
-                        func_lines = node.end_lineno - node.lineno + 1
-                        if func_lines > 50:
-                            complex_files.append({
-                                "file": str(file_path),
-                                "function": node.name,
-                                "lines": func_lines,
-                                "issue": "函数过长",
-                                "suggestion": "考虑拆分函数"
-                            })
-                            
-            except Exception as e:
-                print(f"⚠️ 分析文件 {file_path} 时出错: {e}")
+        for loaded in self._load_files():
+            file_path, lines, tree = loaded["path"], loaded["lines"], loaded["tree"]
+            if loaded["content"] is None:
+                print(f"⚠️ 分析文件 {file_path} 时出错: {loaded['error']}")
+                continue
+            
+            # 检查文件长度
+            if len(lines) > 500:
+                complex_files.append({
+                    "file": str(file_path),
+                    "lines": len(lines),
+                    "issue": "文件过长",
+                    "suggestion": "考虑拆分为多个模块"
+                })
+            
+            # 检查函数长度
+            if tree is None:
+                print(f"⚠️ 分析文件 {file_path} 时出错: {loaded['error']}")
+                continue
+            
+            for node in ast.walk(tree):
+                if isinstance(node, ast.FunctionDef):
+                    func_lines = node.end_lineno - node.lineno + 1
+                    if func_lines > 50:
+                        complex_files.append({
+                            "file": str(file_path),
+                            "function": node.name,
+                            "lines": func_lines,
+                            "issue": "函数过长",
+                            "suggestion": "考虑拆分函数"
+                        })
         
         if complex_files:
             self.issues["complexity"] = complex_files
@@ -146,31 +173,31 @@ class CodeQualityAnalyzer:
         
         pep8_issues = []
         
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
+        for loaded in self._load_files():
+            file_path = loaded["path"]
+            if loaded["content"] is None:
+                print(f"⚠️ 分析文件 {file_path} 时出错: {loaded['error']}")
+                continue
+            
+            for i, line in enumerate(loaded["lines"], 1):
+                stripped = line.rstrip()
                 
-                for i, line in enumerate(lines, 1):
-                    # 检查行长度
-                    if len(line.rstrip()) > 88:  # 稍微宽松的限制
-                        pep8_issues.append({
-                            "file": str(file_path),
-                            "line": i,
-                            "issue": "行长度超过88字符",
-                            "content": line.strip()[:50] + "..."
-                        })
-                    
-                    # 检查尾随空格
-                    if line.rstrip() != line.rstrip('\n'):
-                        pep8_issues.append({
-                            "file": str(file_path),
-                            "line": i,
-                            "issue": "行尾有多余空格"
-                        })
-                        
-            except Exception as e:
-                print(f"⚠️ 分析文件 {file_path} 时出错: {e}")
+                # 检查行长度
+                if len(stripped) > 88:  # 稍微宽松的限制
+                    pep8_issues.append({
+                        "file": str(file_path),
+                        "line": i,
+                        "issue": "行长度超过88字符",
+                        "content": line.strip()[:50] + "..."
+                    })
+                
+                # 检查尾随空格
+                if stripped != line:
+                    pep8_issues.append({
+                        "file": str(file_path),
+                        "line": i,
+                        "issue": "行尾有多余空格"
+                    })
         
         if pep8_issues:
             self.issues["pep8"] = pep8_issues[:20]  # 只显示前20个问题
@@ -3,6 +3,7 @@
 """
 import os
 
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 
 from dotenv import load_dotenv
@@ -10,19 +11,27 @@ from dotenv import load_dotenv
 # 加载环境变量
 load_dotenv()
 
+# API相关环境变量的只读快照
+# 模块只在首次导入时执行，Streamlit每次重跑脚本时直接复用，无需重复读取环境变量
+API_ENV = MappingProxyType({
+    key: value
+    for key in ("ARK_API_KEY", "ARK_BASE_URL", "ARK_MODEL", "OPENAI_API_KEY")
+    if (value := os.getenv(key)) is not None
+})
+
 
 class Config:
     """系统配置类"""
 
     # 火山方舟API配置
-    ARK_API_KEY: Optional[str] = os.getenv("ARK_API_KEY")
-    ARK_BASE_URL: str = os.getenv("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3")
-    ARK_MODEL: str = os.getenv("ARK_MODEL", "ep-20250506230532-w7rdw")
+    ARK_API_KEY: Optional[str] = API_ENV.get("ARK_API_KEY")
+    ARK_BASE_URL: str = API_ENV.get("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3")
+    ARK_MODEL: str = API_ENV.get("ARK_MODEL", "ep-20250506230532-w7rdw")
 
     # OpenAI兼容配置
-    OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY") or os.getenv("ARK_API_KEY")
-    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", os.getenv("ARK_MODEL", "ep-20250506230532-w7rdw"))
-    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", os.getenv("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3"))
+    OPENAI_API_KEY: Optional[str] = API_ENV.get("OPENAI_API_KEY") or ARK_API_KEY
+    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", ARK_MODEL)
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", ARK_BASE_URL)
     OPENAI_TEMPERATURE: float = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
 
     # ChromaDB配置
@@ -4,6 +4,7 @@
 支持多种搜索引擎，智能搜索判断，结果格式化
 """
 import asyncio
+import inspect
 import re
 import time
 import json
@@ -111,7 +112,45 @@ class DateTimeHelper:
 
 class EnhancedSearchEngine:
     """增强的搜索引擎"""
-    
+
+    # 不需要搜索的问题类型（定义、教程、基本时间问题）
+    _no_search_re = re.compile('|'.join([
+        r'今天是.*[几多].*[号日]',  # 今天是几号
+        r'今天是多久',             # 今天是多久
+        r'现在是.*[几多].*点',      # 现在是几点
+        r'今天.*星期[几天]',        # 今天星期几
+        r'什么是.*',               # 定义类问题
+        r'^如何.*',                # 教程类问题（开头是"如何"）
+        r'^怎么.*',                # 方法类问题（开头是"怎么"）
+        r'^为什么.*',              # 原理类问题（开头是"为什么"）
+    ]))
+
+    # 实时信息关键词：命中时即使属于上述问题类型也仍需搜索
+    _realtime_re = re.compile('|'.join(map(re.escape, [
+        '股市', '行情', '股价', '新闻', '天气', '疫情'
+    ])))
+
+    # 需要搜索的关键词
+    _trigger_re = re.compile('|'.join(map(re.escape, [
+        '最新', '新闻', '消息', '发布', '更新', '公告', '通知',
+        '股价', '汇率', '天气', '疫情', '政策', '股市',
+        '什么时候', '何时', '最近发生', '刚刚发生', '刚刚'
+    ])))
+
+    # 需要搜索的模式，以及询问时事或最新信息的模式（但排除基本时间问题）
+    _search_pattern_re = re.compile('|'.join([
+        r'.*行情.*如何',
+        r'现在.*行情',
+        r'当前.*行情',
+        r'今日.*行情',
+        r'.*股市.*怎么样',
+        r'.*股市.*如何',
+        r'\d{4}年.*[新最].*',      # 2024年最新
+        r'本[周月年].*[新最].*',    # 本周最新
+        r'[新最].*\d{4}年',        # 最新2024年
+        r'[新最].*[消息新闻]',      # 最新消息
+    ]))
+
     def __init__(self):
         self.search_cache = {}
         self.cache_ttl = 3600  # 缓存1小时
@@ -127,70 +166,19 @@ class EnhancedSearchEngine:
         ]
     
     def should_search(self, query: str) -> bool:
-        """判断是否需要搜索"""
+        """判断是否需要搜索（各类规则均为预编译的单个正则）"""
         query_lower = query.lower()
 
-        # 不需要搜索的问题类型
-        no_search_patterns = [
-            r'今天是.*[几多].*[号日]',  # 今天是几号
-            r'今天是多久',             # 今天是多久
-            r'现在是.*[几多].*点',      # 现在是几点
-            r'今天.*星期[几天]',        # 今天星期几
-            r'什么是.*',               # 定义类问题
-            r'^如何.*',                # 教程类问题（开头是"如何"）
-            r'^怎么.*',                # 方法类问题（开头是"怎么"）
-            r'^为什么.*',              # 原理类问题（开头是"为什么"）
-        ]
-
         # 检查是否为不需要搜索的问题（但要排除包含实时信息关键词的问题）
-        for pattern in no_search_patterns:
-            if re.search(pattern, query):
-                # 如果包含实时信息关键词，仍然需要搜索
-                realtime_keywords = ['股市', '行情', '股价', '新闻', '天气', '疫情']
-                has_realtime = any(keyword in query_lower for keyword in realtime_keywords)
-                if not has_realtime:
-                    return False
-
-        # 需要搜索的关键词和模式
-        search_keywords = [
-            '最新', '新闻', '消息', '发布', '更新', '公告', '通知',
-            '股价', '汇率', '天气', '疫情', '政策', '股市',
-            '什么时候', '何时', '最近发生', '刚刚发生', '刚刚'
-        ]
+        if self._no_search_re.search(query) and not self._realtime_re.search(query_lower):
+            return False
 
-        # 需要搜索的模式
-        search_patterns = [
-            r'.*行情.*如何',
-            r'现在.*行情',
-            r'当前.*行情',
-            r'今日.*行情',
-            r'.*股市.*怎么样',
-            r'.*股市.*如何'
-        ]
+        # 检查是否包含需要搜索的关键词，或匹配搜索模式
+        return bool(self._trigger_re.search(query_lower) or self._search_pattern_re.search(query))
 
-        # 检查是否包含需要搜索的关键词
-        for keyword in search_keywords:
-            if keyword in query_lower:
-                return True
-
-        # 检查是否匹配搜索模式
-        for pattern in search_patterns:
-            if re.search(pattern, query):
-                return True
-
-        # 检查是否询问时事或最新信息（但排除基本时间问题）
-        time_patterns = [
-            r'\d{4}年.*[新最].*',      # 2024年最新
-            r'本[周月年].*[新最].*',    # 本周最新
-            r'[新最].*\d{4}年',        # 最新2024年
-            r'[新最].*[消息新闻]',      # 最新消息
-        ]
-
-        for pattern in time_patterns:
-            if re.search(pattern, query):
-                return True
-
-        return False
+    def should_search_many(self, queries: List[str]) -> List[bool]:
+        """批量判断多个查询是否需要搜索"""
+        return [self.should_search(query) for query in queries]
     
     async def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """执行搜索"""
@@ -248,7 +236,7 @@ class EnhancedSearchEngine:
             }
 
             # 在线程池中执行同步请求
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             response = await loop.run_in_executor(
                 None,
                 lambda: requests.get(search_url, headers=headers, timeout=10)
@@ -274,9 +262,6 @@ class EnhancedSearchEngine:
         # 简单的文本解析（不依赖BeautifulSoup）
         # 这是一个基础实现，实际项目中建议使用BeautifulSoup
         try:
-            # 查找标题和链接的模式
-            import re
-
             # 简化的结果提取
             for i in range(min(max_results, 3)):
                 results.append({
@@ -528,14 +513,7 @@ class SmartSearchManager:
 """
 
                     # 生成AI回答
-                    response = client.chat.completions.create(
-                        model=model,
-                        messages=[{"role": "user", "content": enhanced_prompt}],
-                        max_tokens=1500,
-                        temperature=0.7
-                    )
-
-                    ai_answer = response.choices[0].message.content
+                    ai_answer = await self._create_completion(client, model, enhanced_prompt)
 
                     # 组合最终回答
                     final_answer = f"{ai_answer}\n\n---\n\n{search_context}"
@@ -550,14 +528,28 @@ class SmartSearchManager:
                 # 搜索失败时继续正常对话
 
         # 不需要搜索或搜索失败时的正常处理
-        response = client.chat.completions.create(
+        answer = await self._create_completion(client, model, query)
+
+        return answer, used_search
+
+    async def _create_completion(self, client, model: str, prompt: str) -> str:
+        """调用对话补全接口，同步客户端在线程池中执行以免阻塞事件循环"""
+        request = dict(
             model=model,
-            messages=[{"role": "user", "content": query}],
+            messages=[{"role": "user", "content": prompt}],
             max_tokens=1500,
             temperature=0.7
         )
 
-        return response.choices[0].message.content, used_search
+        # SDK的create经过装饰器包装，无法从函数本身判断是否为协程函数；
+        # 统一在线程池中调用，异步客户端（AsyncOpenAI）返回的协程再在事件循环中等待
+        create = client.chat.completions.create
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, lambda: create(**request))
+        if inspect.isawaitable(response):
+            response = await response
+
+        return response.choices[0].message.content
 
 
 # 全局搜索管理器实例
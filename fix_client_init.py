@@ -8,6 +8,8 @@ AI客户端初始化问题诊断和修复工具
 import os
 import sys
 
+from importlib.util import find_spec
+
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -211,11 +213,11 @@ def check_dependencies():
 
     missing_packages = []
 
+    # 只查找模块规格判断是否安装，不执行包的初始化代码
     for package in required_packages:
-        try:
-            __import__(package.replace("-", "_"))
+        if find_spec(package.replace("-", "_")) is not None:
             print(f"✅ {package}")
-        except ImportError:
+        else:
             print(f"❌ {package} 未安装")
             missing_packages.append(package)
 
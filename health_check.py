@@ -27,11 +27,7 @@ except ImportError:
 
 # 导入安全模块
 try:
-    from security import (
-
-        get_input_validator, get_security_logger, get_session_manager,
-        get_security_auditor
-    )
+    from security import get_security_snapshot
     SECURITY_AVAILABLE = True
 except ImportError:
     SECURITY_AVAILABLE = False
@@ -43,16 +39,35 @@ class HealthChecker:
     """健康检查器"""
 
 
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 5.0):
         self.start_time = time.time()
         self.last_check_time = 0
         self.health_status = "unknown"
         self.health_details = {}
 
+        # 健康检查结果缓存时间（秒），短时间内的重复探测直接复用上次结果
+        self.cache_ttl = cache_ttl
+        self._check_lock = threading.Lock()
 
-    def check_system_health(self) -> Dict[str, Any]:
-        """检查系统健康状态"""
-        current_time = time.time()
+
+    def check_system_health(self, force: bool = False) -> Dict[str, Any]:
+        """
+        检查系统健康状态
+
+        Args:
+            force: 是否忽略缓存强制重新检查
+        """
+        with self._check_lock:
+            current_time = time.time()
+            if (not force and self.health_details
+                    and current_time - self.last_check_time < self.cache_ttl):
+                return self.health_details
+
+            return self._run_health_checks(current_time)
+
+
+    def _run_health_checks(self, current_time: float) -> Dict[str, Any]:
+        """执行全部健康检查"""
         uptime = current_time - self.start_time
 
         health_data = {
@@ -70,9 +85,15 @@ class HealthChecker:
         if PERFORMANCE_AVAILABLE:
             health_data["checks"]["performance"] = self._check_performance_components()
 
-        # 安全组件检查
+        # 安全组件检查：统计数据在此读取一次后传入，避免检查函数内部重复获取
         if SECURITY_AVAILABLE:
-            health_data["checks"]["security"] = self._check_security_components()
+            try:
+                snapshot = get_security_snapshot()
+                health_data["checks"]["security"] = self._check_security_components(
+                    snapshot["validation"], snapshot["audit"]
+                )
+            except Exception as e:
+                health_data["checks"]["security"] = {"status": "error", "error": str(e)}
 
         # 确定整体健康状态
         overall_status = self._determine_overall_status(health_data["checks"])
@@ -160,21 +181,21 @@ class HealthChecker:
             }
 
 
-    def _check_security_components(self) -> Dict[str, Any]:
-        """检查安全组件"""
-        try:
-            input_validator = get_input_validator()
-            security_logger = get_security_logger()
-            session_manager = get_session_manager()
-            security_auditor = get_security_auditor()
+    def _check_security_components(self, validation_stats: Dict[str, Any],
+                                   security_summary: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        检查安全组件
 
+        Args:
+            validation_stats: 输入验证统计
+            security_summary: 安全审计摘要
+        """
+        try:
             # 输入验证检查
-            validation_stats = input_validator.get_validation_stats()
             block_rate = validation_stats.get("block_rate", 0)
             validation_status = "healthy" if block_rate < 10 else "warning" if block_rate < 30 else "critical"
 
             # 安全审计检查
-            security_summary = security_auditor.get_security_summary()
             total_events = security_summary.get("total_events", 0)
             critical_events = security_summary.get("severity_counts", {}).get("CRITICAL", 0)
             audit_status = "healthy" if critical_events == 0 else "warning" if critical_events < 5 else "critical"
@@ -286,13 +307,7 @@ def get_metrics():
             }
 
         if SECURITY_AVAILABLE:
-            input_validator = get_input_validator()
-            security_auditor = get_security_auditor()
-
-            metrics["security"] = {
-                "validation": input_validator.get_validation_stats(),
-                "audit": security_auditor.get_security_summary()
-            }
+            metrics["security"] = get_security_snapshot()
 
         return jsonify({
             "timestamp": datetime.now().isoformat(),
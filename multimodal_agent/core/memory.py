@@ -2,7 +2,9 @@
 记忆管理系统
 """
 import asyncio
+import json
 import logging
+import os
 
 from typing import List, Dict, Any, Optional
 
@@ -367,8 +369,6 @@ class MemoryManager:
         """从内容中提取主题"""
         try:
             # 简单的主题提取
-            import re
-
             # 常见主题关键词
             topic_keywords = {
                 "技术": ["技术", "编程", "代码", "开发", "软件", "算法", "数据库"],
@@ -397,10 +397,6 @@ class MemoryManager:
     async def backup_memory(self, backup_path: str) -> bool:
         """备份记忆数据"""
         try:
-            import json
-
-            import os
-
             # 获取所有记忆数据
             all_memories = await self.search_memory(query="", k=10000)
 
@@ -433,8 +429,6 @@ class MemoryManager:
     async def restore_memory(self, backup_path: str) -> bool:
         """恢复记忆数据"""
         try:
-            import json
-
             # 读取备份文件
             with open(backup_path, 'r', encoding='utf-8') as f:
                 backup_data = json.load(f)
@@ -1,9 +1,12 @@
 """
 计算工具
 """
+import ast
 import asyncio
+import functools
 import logging
 import math
+import operator
 import re
 
 from typing import Optional, Type
@@ -14,6 +17,69 @@ from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
 
+# 表达式清理正则（模块加载时编译一次）
+_EXPRESSION_CLEAN_RE = re.compile(r'[^0-9+\-*/().,\s]')
+
+# 允许的运算符（白名单）
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# 幂运算指数上限，防止超大整数计算卡死
+_MAX_EXPONENT = 1000
+
+# 幂运算结果的位数上限：嵌套幂运算的底数本身可能已经很大，只限制指数不够
+_MAX_RESULT_BITS = 100_000
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_expression(expression: str) -> ast.Expression:
+    """解析表达式（相同表达式只解析一次）"""
+    return ast.parse(expression, mode="eval")
+
+
+def _check_power(base, exponent):
+    """在真正计算幂之前估算结果的位数，超出预算时拒绝计算"""
+    if abs(exponent) > _MAX_EXPONENT:
+        raise ValueError(f"指数过大: {exponent}")
+
+    # 整数用bit_length，浮点数用二进制指数，统一估算底数的位数
+    if isinstance(base, int):
+        base_bits = abs(base).bit_length()
+    else:
+        base_bits = math.frexp(abs(base))[1]
+
+    if base_bits * abs(exponent) > _MAX_RESULT_BITS:
+        raise ValueError("幂运算结果过大")
+
+
+def _evaluate_node(node: ast.AST):
+    """按白名单递归求值AST节点"""
+    if isinstance(node, ast.Expression):
+        return _evaluate_node(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.Tuple):
+        return tuple(_evaluate_node(element) for element in node.elts)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_evaluate_node(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        left = _evaluate_node(node.left)
+        right = _evaluate_node(node.right)
+        if isinstance(node.op, ast.Pow):
+            _check_power(left, right)
+        return _BINARY_OPERATORS[type(node.op)](left, right)
+    raise ValueError(f"不支持的表达式: {type(node).__name__}")
+
 
 class CalculatorInput(BaseModel):
     """计算器输入模型"""
@@ -33,16 +99,11 @@ class CalculatorTool(BaseTool):
 
     async def _arun(self, expression: str) -> str:
         try:
-            # 安全的数学计算
-            allowed_names = {
-                k: v for k, v in math.__dict__.items() if not k.startswith("__")
-            }
-            allowed_names.update({"abs": abs, "round": round})
-
             # 清理表达式
-            expression = re.sub(r'[^0-9+\-*/().,\s]', '', expression)
+            expression = _EXPRESSION_CLEAN_RE.sub('', expression)
 
-            result = eval(expression, {"__builtins__": {}}, allowed_names)
+            # 安全的数学计算（只允许白名单内的AST节点）
+            result = _evaluate_node(_parse_expression(expression))
             return f"计算结果: {expression} = {result}"
         except Exception as e:
             return f"计算失败: {str(e)}"
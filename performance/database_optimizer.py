@@ -3,6 +3,7 @@
 提供查询分析、索引建议、连接池管理等功能
 """
 
+import re
 import time
 import asyncio
 import logging
@@ -255,8 +256,6 @@ class DatabaseOptimizer:
         columns = []
         
         # 简单的列名提取
-        import re
-        
         # 查找 column = value 或 column IN (...) 等模式
         patterns = [
             r'(\w+)\s*=',
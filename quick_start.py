@@ -8,6 +8,7 @@
 import streamlit as st
 import os
 import sys
+import datetime
 
 from pathlib import Path
 
@@ -109,8 +110,11 @@ def simple_chat_interface(client):
 
         # 生成AI回复
         with st.chat_message("assistant"):
-            with st.spinner("AI正在思考..."):
-                try:
+            response_placeholder = st.empty()
+            assistant_response = ""
+
+            try:
+                with st.spinner("AI正在思考..."):
                     response = client.chat.completions.create(
                         model=os.getenv("ARK_MODEL", "ep-20250506230532-w7rdw"),
                         messages=[
@@ -119,19 +123,30 @@ def simple_chat_interface(client):
                               for m in st.session_state.messages[-10:]]  # 保留最近10条消息
                         ],
                         max_tokens=1000,
-                        temperature=0.7
+                        temperature=0.7,
+                        stream=True
                     )
 
-                    assistant_response = response.choices[0].message.content
-                    st.markdown(assistant_response)
+                # 流式显示回复，首个token到达即开始渲染
+                for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content is not None:
+                        assistant_response += chunk.choices[0].delta.content
+                        response_placeholder.markdown(assistant_response + "▌")
+
+                response_placeholder.markdown(assistant_response)
 
-                    # 添加助手消息
-                    st.session_state.messages.append({"role": "assistant", "content": assistant_response})
+                # 添加助手消息
+                st.session_state.messages.append({"role": "assistant", "content": assistant_response})
 
-                except Exception as e:
-                    error_msg = f"抱歉，处理您的请求时出现错误: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+            except Exception as e:
+                error_msg = f"抱歉，处理您的请求时出现错误: {str(e)}"
+                st.error(error_msg)
+
+                # 保留已经流式输出的部分内容
+                if assistant_response:
+                    response_placeholder.markdown(assistant_response)
+                    error_msg = f"{assistant_response}\n\n{error_msg}"
+                st.session_state.messages.append({"role": "assistant", "content": error_msg})
 
 
 def simple_file_interface():
@@ -179,8 +194,6 @@ def system_status():
         st.metric("状态", "运行中", delta="正常")
 
     with col3:
-        import datetime
-
         current_time = datetime.datetime.now().strftime("%H:%M:%S")
         st.metric("当前时间", current_time)
 
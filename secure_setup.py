@@ -155,17 +155,24 @@ def test_configuration():
     print("\n🧪 测试配置...")
 
     try:
-        from dotenv import load_dotenv
-
-        load_dotenv()
-
-        ark_api_key = os.getenv("ARK_API_KEY")
+        # .env由create_env_file生成，只包含简单的KEY=value行，
+        # 直接解析即可，无需导入python-dotenv
+        env = {}
+        with open(".env", "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, value = line.split("=", 1)
+                env[key.strip()] = value.strip()
+
+        ark_api_key = env.get("ARK_API_KEY")
         if ark_api_key and not ark_api_key.startswith('your_'):
             print("✅ 火山方舟API密钥已配置")
         else:
             print("⚠️ 火山方舟API密钥未配置")
 
-        openai_api_key = os.getenv("OPENAI_API_KEY")
+        openai_api_key = env.get("OPENAI_API_KEY")
         if openai_api_key and not openai_api_key.startswith('your_'):
             print("✅ OpenAI API密钥已配置")
         else:
@@ -173,8 +180,8 @@ def test_configuration():
 
         return True
 
-    except ImportError:
-        print("❌ python-dotenv未安装，请运行: pip install python-dotenv")
+    except FileNotFoundError:
+        print("❌ 未找到.env文件")
         return False
     except Exception as e:
         print(f"❌ 配置测试失败: {e}")
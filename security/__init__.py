@@ -16,6 +16,7 @@ from .input_validator import (
     SecurityAuditor,
     get_input_validator,
     get_security_auditor,
+    get_security_snapshot,
 )
 from .exception_handler import (
 
@@ -37,6 +38,7 @@ __all__ = [
     'SecurityAuditor',
     'get_input_validator',
     'get_security_auditor',
+    'get_security_snapshot',
 
     # 异常处理
     'ExceptionHandler',
@@ -4,7 +4,13 @@
 """
 import traceback
 import functools
+import secrets
 import sys
+import time
+
+from collections import Counter, deque
+
+from types import MappingProxyType
 
 from typing import Any, Callable, Dict, Optional, Type, Union
 
@@ -36,18 +42,34 @@ class ErrorCategory(Enum):
 class ExceptionHandler:
     """异常处理器"""
 
+    # 限流计数条目达到该数量时清理窗口已过期的条目
+    RATE_BUCKET_PRUNE_SIZE = 1024
 
-    def __init__(self):
-        """初始化异常处理器"""
-        self.error_counts = {}
-        self.error_history = []
-        self.recovery_strategies = {}
-        self._setup_recovery_strategies()
 
+    def __init__(self, rate_limit_window: float = 1.0, rate_limit_max: int = 5):
+        """
+        初始化异常处理器
 
-    def _setup_recovery_strategies(self):
-        """设置恢复策略"""
-        self.recovery_strategies = {
+        Args:
+            rate_limit_window: 限流时间窗口（秒）
+            rate_limit_max: 窗口内同类异常完整处理的最大次数
+        """
+        self.error_counts = Counter()
+        self.total_errors = 0
+        self.suppressed_errors = 0
+        self.error_history = deque(maxlen=100)
+        self.recovery_strategies = self._setup_recovery_strategies()
+
+        # 异常风暴限流：(会话ID, 异常类型, 类别) -> [窗口开始时间, 窗口内次数]
+        # 按会话分别计数，一个用户触发的异常风暴不会屏蔽其他用户的错误提示
+        self.rate_limit_window = rate_limit_window
+        self.rate_limit_max = rate_limit_max
+        self._rate_buckets = {}
+
+
+    def _setup_recovery_strategies(self) -> MappingProxyType:
+        """设置恢复策略（只读映射，初始化后不再修改）"""
+        return MappingProxyType({
             ErrorCategory.API_ERROR: self._handle_api_error,
             ErrorCategory.FILE_ERROR: self._handle_file_error,
             ErrorCategory.MEMORY_ERROR: self._handle_memory_error,
@@ -55,7 +77,7 @@ class ExceptionHandler:
             ErrorCategory.VALIDATION_ERROR: self._handle_validation_error,
             ErrorCategory.SYSTEM_ERROR: self._handle_system_error,
             ErrorCategory.USER_ERROR: self._handle_user_error
-        }
+        })
 
 
     def handle_exception(self, exception: Exception, context: Dict[str, Any] = None,
@@ -75,6 +97,18 @@ class ExceptionHandler:
         Returns:
             处理结果字典
         """
+        # 同一会话中同类异常短时间内大量出现时只计数，跳过格式化堆栈等开销较大的处理
+        exception_type = type(exception).__name__
+        session_id = self._get_session_id()
+        if self._is_rate_limited(session_id, exception_type, category):
+            self.error_counts[exception_type] += 1
+            self.total_errors += 1
+            self.suppressed_errors += 1
+            return {
+                'handled': True,
+                'suppressed': True
+            }
+
         error_info = {
             'timestamp': datetime.now().isoformat(),
             'exception_type': type(exception).__name__,
@@ -83,14 +117,14 @@ class ExceptionHandler:
             'severity': severity.value,
             'context': context or {},
             'traceback': traceback.format_exc(),
-            'session_id': self._get_session_id()
+            'session_id': session_id
         }
 
         # 记录错误
         self._log_error(error_info)
 
         # 执行恢复策略
-        recovery_result = self._execute_recovery_strategy(category, exception, context)
+        recovery_result = self.recovery_strategies.get(category, self._handle_system_error)(exception, context)
 
         # 显示用户友好的错误消息
         self._display_user_message(severity, user_message or recovery_result.get('user_message', '发生了未知错误'))
@@ -102,6 +136,28 @@ class ExceptionHandler:
         }
 
 
+    def _is_rate_limited(self, session_id: str, exception_type: str, category: ErrorCategory) -> bool:
+        """检查该会话的该类异常在当前时间窗口内是否已超过完整处理次数"""
+        now = time.monotonic()
+        key = (session_id, exception_type, category)
+        bucket = self._rate_buckets.get(key)
+
+        if bucket is None:
+            # 计数按会话累积，条目较多时顺带清理窗口已过期的条目
+            if len(self._rate_buckets) >= self.RATE_BUCKET_PRUNE_SIZE:
+                self._rate_buckets = {
+                    bucket_key: value for bucket_key, value in self._rate_buckets.items()
+                    if now - value[0] <= self.rate_limit_window
+                }
+            bucket = self._rate_buckets[key] = [now, 0]
+
+        if now - bucket[0] > self.rate_limit_window:
+            bucket[0], bucket[1] = now, 0
+
+        bucket[1] += 1
+        return bucket[1] > self.rate_limit_max
+
+
     def safe_execute(self, func: Callable, *args, fallback_value: Any = None,
                     category: ErrorCategory = ErrorCategory.SYSTEM_ERROR,
                     user_message: str = None, **kwargs) -> Any:
@@ -135,39 +191,28 @@ class ExceptionHandler:
         """记录错误信息"""
         # 更新错误计数
         error_type = error_info['exception_type']
-        self.error_counts[error_type] = self.error_counts.get(error_type, 0) + 1
+        self.error_counts[error_type] += 1
+        self.total_errors += 1
 
-        # 添加到历史记录
+        # 添加到历史记录（deque自动丢弃最早的记录）
         self.error_history.append(error_info)
 
-        # 保持历史记录大小
-        if len(self.error_history) > 100:
-            self.error_history = self.error_history[-50:]
-
-        # 记录到session state（用于UI显示）
-        if 'error_log' not in st.session_state:
-            st.session_state.error_log = []
+        # 记录到session state（用于UI显示），取出一次后原地追加，deque自动保持日志大小
+        error_log = st.session_state.get('error_log')
+        if error_log is None:
+            error_log = deque(maxlen=20)
+            st.session_state.error_log = error_log
 
-        st.session_state.error_log.append({
+        error_log.append({
             'timestamp': error_info['timestamp'],
             'type': error_info['exception_type'],
             'message': error_info['exception_message'],
             'severity': error_info['severity']
         })
 
-        # 保持session state日志大小
-        if len(st.session_state.error_log) > 20:
-            st.session_state.error_log = st.session_state.error_log[-10:]
 
-
-    def _execute_recovery_strategy(self, category: ErrorCategory,
-                                 exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
-        """执行恢复策略"""
-        strategy = self.recovery_strategies.get(category, self._handle_system_error)
-        return strategy(exception, context)
-
-
-    def _handle_api_error(self, exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _handle_api_error(exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
         """处理API错误"""
         if "timeout" in str(exception).lower():
             return {
@@ -183,7 +228,8 @@ class ExceptionHandler:
             }
 
 
-    def _handle_file_error(self, exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _handle_file_error(exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
         """处理文件错误"""
         return {
             'action': 'skip_file_processing',
@@ -192,7 +238,8 @@ class ExceptionHandler:
         }
 
 
-    def _handle_memory_error(self, exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _handle_memory_error(exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
         """处理内存错误"""
         return {
             'action': 'cleanup_memory',
@@ -201,7 +248,8 @@ class ExceptionHandler:
         }
 
 
-    def _handle_network_error(self, exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _handle_network_error(exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
         """处理网络错误"""
         return {
             'action': 'retry_with_backoff',
@@ -210,7 +258,8 @@ class ExceptionHandler:
         }
 
 
-    def _handle_validation_error(self, exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _handle_validation_error(exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
         """处理验证错误"""
         return {
             'action': 'prompt_correction',
@@ -219,7 +268,8 @@ class ExceptionHandler:
         }
 
 
-    def _handle_system_error(self, exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _handle_system_error(exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
         """处理系统错误"""
         return {
             'action': 'graceful_degradation',
@@ -228,7 +278,8 @@ class ExceptionHandler:
         }
 
 
-    def _handle_user_error(self, exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _handle_user_error(exception: Exception, context: Dict[str, Any]) -> Dict[str, Any]:
         """处理用户错误"""
         return {
             'action': 'provide_guidance',
@@ -250,23 +301,21 @@ class ExceptionHandler:
 
 
     def _get_session_id(self) -> str:
-        """获取会话ID"""
-        if 'session_id' not in st.session_state:
-            import hashlib
-
-            session_data = f"{datetime.now().isoformat()}_{id(st.session_state)}"
-            st.session_state.session_id = hashlib.md5(session_data.encode()).hexdigest()[:16]
-        return st.session_state.session_id
+        """获取会话ID（已存在时直接返回，只在首次使用时生成）"""
+        session_id = st.session_state.get('session_id')
+        if session_id is None:
+            session_id = secrets.token_hex(8)
+            st.session_state.session_id = session_id
+        return session_id
 
 
     def get_error_statistics(self) -> Dict[str, Any]:
         """获取错误统计信息"""
-        total_errors = sum(self.error_counts.values())
-
         return {
-            'total_errors': total_errors,
+            'total_errors': self.total_errors,
+            'suppressed_errors': self.suppressed_errors,
             'error_counts': self.error_counts,
-            'recent_errors': self.error_history[-10:] if self.error_history else [],
+            'recent_errors': list(self.error_history)[-10:],
             'error_rate': len(self.error_history) / max(1, len(st.session_state.get('operation_count', [1])))
         }
 
@@ -5,16 +5,27 @@
 import re
 import html
 import json
-import hashlib
+import secrets
 import mimetypes
+import threading
 
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pathlib import Path
 import streamlit as st
 
+from collections import deque
+
 from datetime import datetime
 
+# 尝试导入Hyperscan（多模式一次扫描），不可用时回退到正则逐个匹配
+try:
+    import hyperscan
+
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
 
 class InputValidator:
     """输入验证器"""
@@ -35,13 +46,36 @@ class InputValidator:
         r'system\s*\(',               # 系统调用
     ]
 
+    # 预编译的危险模式：合并为一个正则，一次扫描即可判断（类定义时编译一次）
+    DANGEROUS_REGEX = re.compile(
+        "|".join(f"(?:{pattern})" for pattern in DANGEROUS_PATTERNS), re.IGNORECASE
+    )
+
+    # 控制字符删除表（保留换行和制表符），配合str.translate一次完成
+    CONTROL_CHAR_TABLE = dict.fromkeys(
+        [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F]
+    )
+
+    # 连续空白字符
+    WHITESPACE_REGEX = re.compile(r'\s+')
+
+    # 文件名中的危险字符（含路径穿越用的".."）
+    DANGEROUS_FILENAME_REGEX = re.compile(r'\.\.|[/\\:*?"<>|]')
+
     # 允许的文件类型
     ALLOWED_FILE_TYPES = {
-        'text': ['.txt', '.md', '.csv', '.json', '.xml', '.yaml', '.yml'],
-        'document': ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx'],
-        'image': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp'],
-        'audio': ['.mp3', '.wav', '.ogg', '.m4a', '.flac'],
-        'video': ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm']
+        'text': frozenset(('.txt', '.md', '.csv', '.json', '.xml', '.yaml', '.yml')),
+        'document': frozenset(('.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx')),
+        'image': frozenset(('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp')),
+        'audio': frozenset(('.mp3', '.wav', '.ogg', '.m4a', '.flac')),
+        'video': frozenset(('.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm'))
+    }
+
+    # 扩展名到类别的反向索引（由ALLOWED_FILE_TYPES生成，保持两者一致）
+    EXTENSION_CATEGORIES: Dict[str, str] = {
+        extension: category
+        for category, extensions in ALLOWED_FILE_TYPES.items()
+        for extension in extensions
     }
 
     # 最大文件大小 (MB)
@@ -63,6 +97,50 @@ class InputValidator:
             'blocked_files': 0
         }
 
+        # Hyperscan数据库及其扫描锁（scratch空间不能被多个线程同时使用）
+        self._hs_database = self._build_hyperscan_database()
+        self._hs_lock = threading.Lock()
+
+
+    def _build_hyperscan_database(self):
+        """将危险模式编译为一个Hyperscan数据库，失败时返回None"""
+        if not HYPERSCAN_AVAILABLE:
+            return None
+
+        try:
+            pattern_count = len(self.DANGEROUS_PATTERNS)
+            database = hyperscan.Database()
+            database.compile(
+                expressions=[pattern.encode() for pattern in self.DANGEROUS_PATTERNS],
+                ids=list(range(pattern_count)),
+                elements=pattern_count,
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * pattern_count
+            )
+            return database
+        except Exception:
+            return None
+
+
+    def _contains_dangerous_pattern(self, text: str) -> bool:
+        """检查文本是否命中任一危险模式"""
+        if self._hs_database is not None:
+            matched = []
+
+            def on_match(pattern_id, start, end, flags, context):
+                matched.append(pattern_id)
+                return True  # 命中第一个模式即终止扫描
+
+            try:
+                with self._hs_lock:
+                    self._hs_database.scan(text.encode('utf-8'), match_event_handler=on_match)
+                return bool(matched)
+            except Exception:
+                # 提前终止会抛出异常；若尚未命中则回退到正则检查
+                if matched:
+                    return True
+
+        return self.DANGEROUS_REGEX.search(text) is not None
+
 
     def validate_text_input(self, text: str, max_length: int = 10000,
                            allow_html: bool = False) -> Tuple[bool, str, str]:
@@ -87,10 +165,9 @@ class InputValidator:
             return False, "", f"输入长度超过限制 ({max_length} 字符)"
 
         # 检查危险模式
-        for pattern in self.DANGEROUS_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                self.validation_stats['blocked_inputs'] += 1
-                return False, "", f"输入包含不安全内容"
+        if self._contains_dangerous_pattern(text):
+            self.validation_stats['blocked_inputs'] += 1
+            return False, "", f"输入包含不安全内容"
 
         # 清理文本
         cleaned_text = self._clean_text(text, allow_html)
@@ -158,10 +235,10 @@ class InputValidator:
             text = html.escape(text)
 
         # 移除控制字符（保留换行和制表符）
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+        text = text.translate(self.CONTROL_CHAR_TABLE)
 
         # 标准化空白字符
-        text = re.sub(r'\s+', ' ', text)
+        text = self.WHITESPACE_REGEX.sub(' ', text)
 
         # 移除首尾空白
         text = text.strip()
@@ -171,21 +248,13 @@ class InputValidator:
 
     def _validate_filename(self, filename: str) -> bool:
         """验证文件名安全性"""
-        # 检查危险字符
-        dangerous_chars = ['..', '/', '\\', ':', '*', '?', '"', '<', '>', '|']
-        for char in dangerous_chars:
-            if char in filename:
-                return False
-
-        return True
+        # 检查危险字符（一次扫描）
+        return self.DANGEROUS_FILENAME_REGEX.search(filename) is None
 
 
     def _get_file_category(self, extension: str) -> Optional[str]:
         """获取文件类别"""
-        for category, extensions in self.ALLOWED_FILE_TYPES.items():
-            if extension in extensions:
-                return category
-        return None
+        return self.EXTENSION_CATEGORIES.get(extension)
 
 
     def get_validation_stats(self) -> Dict[str, Any]:
@@ -210,7 +279,7 @@ class SecurityAuditor:
 
     def __init__(self):
         """初始化审计器"""
-        self.audit_log = []
+        self.audit_log = deque(maxlen=1000)
 
 
     def log_security_event(self, event_type: str, details: Dict[str, Any],
@@ -224,21 +293,17 @@ class SecurityAuditor:
             'session_id': self._get_session_id()
         }
 
+        # deque自动丢弃最早的事件，保持日志大小
         self.audit_log.append(event)
 
-        # 保持日志大小
-        if len(self.audit_log) > 1000:
-            self.audit_log = self.audit_log[-500:]
-
 
     def _get_session_id(self) -> str:
-        """获取会话ID"""
-        if 'session_id' not in st.session_state:
-            # 生成唯一会话ID
-            session_data = f"{datetime.now().isoformat()}_{id(st.session_state)}"
-            st.session_state.session_id = hashlib.md5(session_data.encode()).hexdigest()[:16]
-
-        return st.session_state.session_id
+        """获取会话ID（已存在时直接返回，只在首次使用时生成）"""
+        session_id = st.session_state.get('session_id')
+        if session_id is None:
+            session_id = secrets.token_hex(8)
+            st.session_state.session_id = session_id
+        return session_id
 
 
     def get_security_summary(self) -> Dict[str, Any]:
@@ -254,7 +319,7 @@ class SecurityAuditor:
         return {
             'total_events': len(self.audit_log),
             'severity_counts': severity_counts,
-            'recent_events': self.audit_log[-10:] if self.audit_log else []
+            'recent_events': list(self.audit_log)[-10:]
         }
 
 # 全局实例
@@ -270,3 +335,16 @@ def get_input_validator() -> InputValidator:
 def get_security_auditor() -> SecurityAuditor:
     """获取安全审计器实例"""
     return security_auditor
+
+
+def get_security_snapshot() -> Dict[str, Any]:
+    """
+    一次性获取安全统计快照
+
+    Returns:
+        包含输入验证统计和安全审计摘要的字典
+    """
+    return {
+        'validation': input_validator.get_validation_stats(),
+        'audit': security_auditor.get_security_summary()
+    }
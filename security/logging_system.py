@@ -2,8 +2,12 @@
 日志记录系统
 实现详细的日志记录，包括用户操作、系统错误、性能监控
 """
+import atexit
+import itertools
 import logging
 import json
+import queue
+import secrets
 
 from typing import Any, Dict, Optional
 
@@ -12,7 +16,11 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import streamlit as st
 
-from logging.handlers import RotatingFileHandler
+from collections import Counter, deque
+
+from time import perf_counter
+
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 from enum import Enum
 
@@ -38,6 +46,28 @@ class LogCategory(Enum):
     MEMORY_USAGE = "MEMORY_USAGE"
 
 
+class _LazyJSON:
+    """延迟序列化的日志数据，只有真正写入日志时才调用json.dumps"""
+
+    __slots__ = ('data',)
+
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+
+
+    def __str__(self) -> str:
+        return json.dumps(self.data, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """不在调用方线程格式化日志的队列处理器（格式化交给后台监听线程）"""
+
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 class SecurityLogger:
     """安全日志记录器"""
 
@@ -63,12 +93,26 @@ class SecurityLogger:
         self._setup_loggers()
 
         # 内存中的日志缓存（用于实时显示）
-        self.log_cache = {category.value: [] for category in LogCategory}
         self.cache_max_size = 100
+        self.log_cache = {category.value: deque(maxlen=self.cache_max_size) for category in LogCategory}
+
+        # 所有类别按写入时间顺序合并的日志，获取最近日志时无需合并排序
+        self.all_logs_cache = deque(maxlen=self.cache_max_size * len(LogCategory))
+
+        # 缓存中日志的级别计数，写入时增量维护，统计时无需遍历缓存
+        self.cached_level_counts = Counter()
 
 
     def _setup_loggers(self):
-        """设置日志记录器"""
+        """
+        设置日志记录器
+
+        各类别记录器只把日志放入队列，由后台QueueListener线程统一写文件，
+        调用方不再阻塞在磁盘I/O上
+        """
+        self._log_queue = queue.Queue(-1)
+        file_handlers = []
+
         for category in LogCategory:
             logger = logging.getLogger(f"security_{category.value.lower()}")
             logger.setLevel(logging.DEBUG)
@@ -92,9 +136,26 @@ class SecurityLogger:
             )
             file_handler.setFormatter(formatter)
 
-            logger.addHandler(file_handler)
+            # 共享一个监听线程，按记录器名称把日志分发到各自的文件
+            file_handler.addFilter(logging.Filter(logger.name))
+            file_handlers.append(file_handler)
+
+            logger.addHandler(_DeferredQueueHandler(self._log_queue))
             self.loggers[category] = logger
 
+        self._queue_listener = QueueListener(
+            self._log_queue, *file_handlers, respect_handler_level=True
+        )
+        self._queue_listener.start()
+        atexit.register(self.stop)
+
+
+    def stop(self):
+        """停止后台写日志线程（会先写完队列中剩余的日志）"""
+        if self._queue_listener is not None:
+            self._queue_listener.stop()
+            self._queue_listener = None
+
 
     def log(self, category: LogCategory, level: LogLevel, message: str,
             data: Dict[str, Any] = None, user_id: str = None):
@@ -120,12 +181,12 @@ class SecurityLogger:
             'message': message,
             'session_id': self._get_session_id(),
             'user_id': user_id or 'anonymous',
-            'data': data or {}
+            # 浅拷贝调用方的数据：序列化在后台线程进行，调用方之后修改原字典不会影响这条日志
+            'data': dict(data) if data else {}
         }
 
-        # 记录到文件
-        log_message = json.dumps(log_data, ensure_ascii=False)
-        getattr(logger, level.value.lower())(log_message)
+        # 记录到文件（JSON序列化延迟到后台线程写入时进行，被级别过滤的日志不会序列化）
+        logger.log(getattr(logging, level.value), "%s", _LazyJSON(log_data))
 
         # 添加到内存缓存
         self._add_to_cache(category, log_data)
@@ -199,38 +260,34 @@ class SecurityLogger:
 
 
     def _add_to_cache(self, category: LogCategory, log_data: Dict[str, Any]):
-        """添加到内存缓存"""
+        """添加到内存缓存（deque自动保持缓存大小）"""
         cache = self.log_cache[category.value]
-        cache.append(log_data)
 
-        # 保持缓存大小
-        if len(cache) > self.cache_max_size:
-            cache.pop(0)
+        # 缓存已满时最早的日志会被挤出，同步扣减其级别计数
+        if len(cache) == cache.maxlen:
+            self.cached_level_counts[cache[0]['level']] -= 1
 
+        cache.append(log_data)
+        self.cached_level_counts[log_data['level']] += 1
+        self.all_logs_cache.append(log_data)
 
-    def _get_session_id(self) -> str:
-        """获取会话ID"""
-        if 'session_id' not in st.session_state:
-            import hashlib
 
-            session_data = f"{datetime.now().isoformat()}_{id(st.session_state)}"
-            st.session_state.session_id = hashlib.md5(session_data.encode()).hexdigest()[:16]
-        return st.session_state.session_id
+    def _get_session_id(self) -> str:
+        """获取会话ID（已存在时直接返回，只在首次使用时生成）"""
+        session_id = st.session_state.get('session_id')
+        if session_id is None:
+            session_id = secrets.token_hex(8)
+            st.session_state.session_id = session_id
+        return session_id
 
 
     def get_recent_logs(self, category: LogCategory = None, limit: int = 50) -> list:
         """获取最近的日志"""
         if category:
-            return self.log_cache[category.value][-limit:]
+            return list(self.log_cache[category.value])[-limit:]
         else:
-            # 合并所有类别的日志
-            all_logs = []
-            for logs in self.log_cache.values():
-                all_logs.extend(logs)
-
-            # 按时间排序
-            all_logs.sort(key=lambda x: x['timestamp'], reverse=True)
-            return all_logs[:limit]
+            # 合并缓存本身按时间顺序写入，倒序取前limit条即为最新日志
+            return list(itertools.islice(reversed(self.all_logs_cache), limit))
 
 
     def get_log_statistics(self, hours: int = 24) -> Dict[str, Any]:
@@ -238,6 +295,17 @@ class SecurityLogger:
         cutoff_time = datetime.now() - timedelta(hours=hours)
         cutoff_str = cutoff_time.isoformat()
 
+        # 缓存中最早的日志都在统计窗口内时，直接使用增量计数
+        if all(not logs or logs[0]['timestamp'] >= cutoff_str for logs in self.log_cache.values()):
+            by_level = {level: count for level, count in self.cached_level_counts.items() if count > 0}
+            return {
+                'total_logs': sum(len(logs) for logs in self.log_cache.values()),
+                'by_category': {name: len(logs) for name, logs in self.log_cache.items() if logs},
+                'by_level': by_level,
+                'error_count': by_level.get('ERROR', 0),
+                'warning_count': by_level.get('WARNING', 0)
+            }
+
         stats = {
             'total_logs': 0,
             'by_category': {},
@@ -277,15 +345,13 @@ def log_performance(operation_name: str):
 
 
         def wrapper(*args, **kwargs):
-            start_time = datetime.now()
+            start_time = perf_counter()
             try:
                 result = func(*args, **kwargs)
-                duration = (datetime.now() - start_time).total_seconds()
-                security_logger.log_performance(operation_name, duration)
+                security_logger.log_performance(operation_name, perf_counter() - start_time)
                 return result
             except Exception as e:
-                duration = (datetime.now() - start_time).total_seconds()
-                security_logger.log_performance(operation_name, duration, {'error': str(e)})
+                security_logger.log_performance(operation_name, perf_counter() - start_time, {'error': str(e)})
                 raise
         return wrapper
     return decorator
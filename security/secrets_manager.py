@@ -4,14 +4,32 @@ API密钥和敏感信息安全处理系统
 """
 import os
 import re
+import math
+import functools
 import hashlib
-import base64
+import hmac
+import itertools
+import time
+
+from collections import Counter, deque
+
+from pathlib import Path
 
 from typing import Dict, List, Optional, Tuple, Any
 
 from datetime import datetime, timedelta
 import streamlit as st
 
+# 优先使用SIMD加速的pybase64（接口与标准库base64兼容）
+try:
+    import pybase64 as base64
+
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    import base64
+
+    PYBASE64_AVAILABLE = False
+
 # 尝试导入加密模块
 try:
     from cryptography.fernet import Fernet
@@ -24,6 +42,134 @@ try:
 except ImportError:
     CRYPTO_AVAILABLE = False
 
+# 尝试导入Rust实现的Fernet（令牌格式兼容，加解密更快）
+try:
+    from rfernet import Fernet as RustFernet
+
+    RFERNET_AVAILABLE = True
+except ImportError:
+    RFERNET_AVAILABLE = False
+
+# 长文本的熵值计算使用numpy向量化
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 超过该长度的文本才使用numpy计算熵值（短文本直接计数更快）
+ENTROPY_NUMPY_MIN_LENGTH = 64
+
+# 开发环境默认密钥的派生结果缓存目录
+KEY_CACHE_DIR = Path.home() / '.cache' / 'ai-agent'
+
+
+class RustFernetCipher:
+    """rfernet适配器，提供与cryptography Fernet相同的bytes接口"""
+
+
+    def __init__(self, key):
+        if isinstance(key, bytes):
+            key = key.decode()
+        self._fernet = RustFernet(key)
+
+
+    def encrypt(self, data: bytes) -> bytes:
+        token = self._fernet.encrypt(data)
+        return token.encode() if isinstance(token, str) else token
+
+
+    def decrypt(self, token: bytes) -> bytes:
+        if isinstance(token, bytes):
+            token = token.decode()
+        return bytes(self._fernet.decrypt(token))
+
+
+@functools.lru_cache(maxsize=None)
+def derive_default_key(password: bytes, salt: bytes) -> bytes:
+    """
+    派生开发环境默认加密密钥
+
+    PBKDF2本身刻意很慢，派生结果在进程内缓存，并以0600权限写入磁盘缓存，
+    之后启动时直接读取，不再重复派生。缓存文件附带由密码和盐计算的校验值，
+    校验不通过（文件损坏或被替换）时重新派生并覆盖。
+    """
+    digest = hashlib.sha256(salt + b'\0' + password).digest()
+    cache_file = KEY_CACHE_DIR / f'enc_key_{digest.hex()[:32]}'
+
+    try:
+        cached_key, cached_check = cache_file.read_bytes().split()
+        if (hmac.compare_digest(cached_check, _key_check_value(digest, cached_key))
+                and len(base64.urlsafe_b64decode(cached_key)) == 32):
+            return cached_key
+    except (OSError, ValueError):
+        pass
+
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    key = base64.urlsafe_b64encode(kdf.derive(password))
+
+    # 先写临时文件再原子替换，避免并发启动时读到半截内容
+    tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+    try:
+        KEY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key + b'\n' + _key_check_value(digest, key))
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+
+    return key
+
+
+def _key_check_value(digest: bytes, key: bytes) -> bytes:
+    """计算缓存密钥的校验值（以密码和盐的摘要为HMAC密钥）"""
+    return hmac.new(digest, key, hashlib.sha256).hexdigest().encode()
+
+
+class AccessLogEntry:
+    """访问日志条目（使用__slots__，比字典更省内存；读取时才转换为字典）"""
+
+    __slots__ = ('timestamp', 'operation', 'key', 'success', 'details', 'session_id')
+
+
+    def __init__(self, timestamp: float, operation: str, key: str, success: bool,
+                 details: str, session_id: str):
+        self.timestamp = timestamp
+        self.operation = operation
+        self.key = key
+        self.success = success
+        self.details = details
+        self.session_id = session_id
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            'timestamp': datetime.fromtimestamp(self.timestamp).isoformat(),
+            'operation': self.operation,
+            'key': self.key,
+            'success': self.success,
+            'details': self.details,
+            'session_id': self.session_id
+        }
+
+
+def create_cipher(key):
+    """创建Fernet加密套件，rfernet可用时优先使用"""
+    if RFERNET_AVAILABLE:
+        return RustFernetCipher(key)
+    return Fernet(key)
+
 
 class SecretsManager:
     """敏感信息管理器"""
@@ -35,7 +181,7 @@ class SecretsManager:
 
         if self.crypto_available:
             self.encryption_key = self._get_or_create_encryption_key()
-            self.cipher_suite = Fernet(self.encryption_key)
+            self.cipher_suite = create_cipher(self.encryption_key)
         else:
             self.encryption_key = None
             self.cipher_suite = None
@@ -55,6 +201,13 @@ class SecretsManager:
             r'client[_-]?secret'
         ]
 
+        # 敏感信息掩码正则：所有键名合并为一个分支，单次扫描完成替换；
+        # 分组1为键名和分隔符，值部分替换为掩码
+        self._mask_regex = re.compile(
+            '((?:' + '|'.join(self.sensitive_patterns) + r')\s*[=:]\s*)[\w\-_]+',
+            re.IGNORECASE
+        )
+
         # API密钥验证规则
         self.api_key_rules = {
             'min_length': 16,
@@ -72,7 +225,10 @@ class SecretsManager:
 
         # 访问控制
         self.access_permissions = {}
-        self.access_log = []
+        self.access_log = deque(maxlen=1000)
+
+        # 解密结果缓存：以密文为键（每次存储的密文都不同），重复读取同一密钥时跳过解密
+        self._decrypt_cached = functools.lru_cache(maxsize=128)(self._decrypt_value)
 
 
     def _get_or_create_encryption_key(self) -> bytes:
@@ -95,13 +251,7 @@ class SecretsManager:
         # 生成新密钥（开发环境）
         password = b"default_secrets_key_change_in_production"
         salt = b"secrets_salt_1234567890123456"
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        return base64.urlsafe_b64encode(kdf.derive(password))
+        return derive_default_key(password, salt)
 
 
     def validate_api_key(self, api_key: str, key_type: str = "general") -> Tuple[bool, List[str]]:
@@ -146,7 +296,7 @@ class SecretsManager:
 
 
     def store_secret(self, key: str, value: str, description: str = "",
-                    expiry_days: int = None) -> bool:
+                    expiry_days: int = None, skip_validation: bool = False) -> bool:
         """
         安全存储敏感信息
 
@@ -155,41 +305,42 @@ class SecretsManager:
             value: 密钥值
             description: 描述
             expiry_days: 过期天数
+            skip_validation: 跳过密钥强度验证（仅用于调用方已生成或验证过的密钥）
 
         Returns:
             是否存储成功
         """
         try:
             # 验证密钥值
-            is_valid, errors = self.validate_api_key(value)
-            if not is_valid:
-                self._log_access("store_secret", key, False, f"Validation failed: {errors}")
-                return False
+            if not skip_validation:
+                is_valid, errors = self.validate_api_key(value)
+                if not is_valid:
+                    self._log_access("store_secret", key, False, f"Validation failed: {errors}")
+                    return False
 
-            # 加密存储（如果可用）
+            # 加密存储（如果可用）；Fernet令牌本身就是URL安全的base64文本，无需再编码
             if self.crypto_available and self.cipher_suite:
-                encrypted_value = self.cipher_suite.encrypt(value.encode())
-                encrypted_data = base64.b64encode(encrypted_value).decode()
+                encrypted_data = self.cipher_suite.encrypt(value.encode()).decode('ascii')
             else:
                 # 简单编码（非加密）
                 encrypted_data = base64.b64encode(value.encode()).decode()
 
-            # 构建存储数据
+            # 构建存储数据（创建时间和过期时间基于同一时刻）
+            now = datetime.now()
+            expiry_datetime = now + timedelta(days=expiry_days) if expiry_days else None
             secret_data = {
                 'encrypted_value': encrypted_data,
                 'description': description,
-                'created_at': datetime.now().isoformat(),
+                'created_at': now.isoformat(),
                 'last_accessed': None,
                 'access_count': 0,
-                'expiry_date': (datetime.now() + timedelta(days=expiry_days)).isoformat() if expiry_days else None,
-                'key_hash': hashlib.sha256(value.encode()).hexdigest()[:16]  # 用于验证
+                'expiry_date': expiry_datetime.isoformat() if expiry_datetime else None,
+                'expiry_timestamp': expiry_datetime.timestamp() if expiry_datetime else None,
+                'key_hash': hashlib.blake2b(value.encode(), digest_size=8).hexdigest()  # 用于验证
             }
 
             # 存储到session state（加密）
-            if 'encrypted_secrets' not in st.session_state:
-                st.session_state.encrypted_secrets = {}
-
-            st.session_state.encrypted_secrets[key] = secret_data
+            st.session_state.setdefault('encrypted_secrets', {})[key] = secret_data
 
             self._log_access("store_secret", key, True, "Secret stored successfully")
             return True
@@ -211,33 +362,29 @@ class SecretsManager:
             解密后的密钥值
         """
         try:
-            if 'encrypted_secrets' not in st.session_state:
+            # 只访问一次session state，之后在本地字典上操作
+            store = st.session_state.get('encrypted_secrets')
+            if store is None:
                 self._log_access("retrieve_secret", key, False, "No secrets storage found")
                 return None
 
-            if key not in st.session_state.encrypted_secrets:
+            secret_data = store.get(key)
+            if secret_data is None:
                 self._log_access("retrieve_secret", key, False, "Secret not found")
                 return None
 
-            secret_data = st.session_state.encrypted_secrets[key]
+            now = time.time()
 
             # 检查是否过期
-            if secret_data.get('expiry_date'):
-                expiry_date = datetime.fromisoformat(secret_data['expiry_date'])
-                if datetime.now() > expiry_date:
-                    self._log_access("retrieve_secret", key, False, "Secret expired")
-                    return None
+            if self._is_secret_expired(secret_data, now):
+                self._log_access("retrieve_secret", key, False, "Secret expired")
+                return None
 
-            # 解密
-            encrypted_value = base64.b64decode(secret_data['encrypted_value'])
-            if self.crypto_available and self.cipher_suite:
-                decrypted_value = self.cipher_suite.decrypt(encrypted_value).decode()
-            else:
-                # 简单解码（非解密）
-                decrypted_value = encrypted_value.decode()
+            # 解密（命中缓存时直接返回）
+            decrypted_value = self._decrypt_cached(secret_data['encrypted_value'])
 
             # 更新访问信息
-            secret_data['last_accessed'] = datetime.now().isoformat()
+            secret_data['last_accessed'] = datetime.fromtimestamp(now).isoformat()
             secret_data['access_count'] = secret_data.get('access_count', 0) + 1
 
             log_value = "***MASKED***" if mask_in_logs else decrypted_value[:8] + "..."
@@ -261,11 +408,13 @@ class SecretsManager:
             是否删除成功
         """
         try:
-            if 'encrypted_secrets' not in st.session_state:
+            store = st.session_state.get('encrypted_secrets')
+            if store is None:
                 return False
 
-            if key in st.session_state.encrypted_secrets:
-                del st.session_state.encrypted_secrets[key]
+            if key in store:
+                del store[key]
+                self._decrypt_cached.cache_clear()
                 self._log_access("delete_secret", key, True, "Secret deleted")
                 return True
 
@@ -276,13 +425,25 @@ class SecretsManager:
             return False
 
 
+    def _decrypt_value(self, encrypted_data: str) -> str:
+        """解密存储的密钥值"""
+        if self.crypto_available and self.cipher_suite:
+            return self.cipher_suite.decrypt(encrypted_data.encode('ascii')).decode()
+
+        # 简单解码（非解密）
+        return base64.b64decode(encrypted_data).decode()
+
+
     def list_secrets(self) -> List[Dict[str, Any]]:
         """列出所有存储的敏感信息（不包含值）"""
-        if 'encrypted_secrets' not in st.session_state:
+        store = st.session_state.get('encrypted_secrets')
+        if not store:
             return []
 
+        # 过期状态统一基于同一时刻计算
+        now = time.time()
         secrets_info = []
-        for key, secret_data in st.session_state.encrypted_secrets.items():
+        for key, secret_data in store.items():
             info = {
                 'key': key,
                 'description': secret_data.get('description', ''),
@@ -290,8 +451,8 @@ class SecretsManager:
                 'last_accessed': secret_data.get('last_accessed'),
                 'access_count': secret_data.get('access_count', 0),
                 'expiry_date': secret_data.get('expiry_date'),
-                'is_expired': self._is_secret_expired(secret_data),
-                'days_until_expiry': self._days_until_expiry(secret_data)
+                'is_expired': self._is_secret_expired(secret_data, now),
+                'days_until_expiry': self._days_until_expiry(secret_data, now)
             }
             secrets_info.append(info)
 
@@ -302,10 +463,11 @@ class SecretsManager:
         """检查即将过期的密钥"""
         expiring_secrets = []
         warning_days = self.key_rotation_config['warning_days_before_expiry']
+        now = time.time()
 
         for key, secret_data in st.session_state.get('encrypted_secrets', {}).items():
             if secret_data.get('expiry_date'):
-                days_until_expiry = self._days_until_expiry(secret_data)
+                days_until_expiry = self._days_until_expiry(secret_data, now)
                 if 0 <= days_until_expiry <= warning_days:
                     expiring_secrets.append({
                         'key': key,
@@ -318,14 +480,8 @@ class SecretsManager:
 
     def mask_sensitive_data(self, text: str) -> str:
         """掩码文本中的敏感信息"""
-        masked_text = text
-
-        for pattern in self.sensitive_patterns:
-            # 查找敏感信息模式
-            regex = re.compile(f'{pattern}[\\s]*[=:][\\s]*([\\w\\-_]+)', re.IGNORECASE)
-            masked_text = regex.sub(lambda m: f"{m.group(0).split('=')[0]}=***MASKED***", masked_text)
-
-        return masked_text
+        # 保留键名和分隔符（=或:），只替换值
+        return self._mask_regex.sub(r'\1***MASKED***', text)
 
 
     def _calculate_entropy(self, text: str) -> float:
@@ -333,67 +489,73 @@ class SecretsManager:
         if not text:
             return 0.0
 
-        # 计算字符频率
-        char_counts = {}
-        for char in text:
-            char_counts[char] = char_counts.get(char, 0) + 1
+        text_length = len(text)
 
-        # 计算熵
-        import math
+        if NUMPY_AVAILABLE and text_length >= ENTROPY_NUMPY_MIN_LENGTH:
+            # 按Unicode码点统计字符频率（UTF-32每个字符固定4字节）
+            code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+            _, counts = np.unique(code_points, return_counts=True)
+            probabilities = counts / text_length
+            return float(-(probabilities * np.log2(probabilities)).sum())
 
+        # 计算字符频率
         entropy = 0.0
-        text_length = len(text)
-
-        for count in char_counts.values():
+        for count in Counter(text).values():
             probability = count / text_length
-            if probability > 0:
-                entropy -= probability * math.log2(probability)
+            entropy -= probability * math.log2(probability)
 
         return entropy
 
 
-    def _is_secret_expired(self, secret_data: Dict[str, Any]) -> bool:
+    def _get_expiry_timestamp(self, secret_data: Dict[str, Any]) -> Optional[float]:
+        """获取过期时间戳（存储时已记录；旧数据解析一次ISO字符串后缓存到条目上）"""
+        expiry_timestamp = secret_data.get('expiry_timestamp')
+        if expiry_timestamp is None:
+            expiry_date = secret_data.get('expiry_date')
+            if not expiry_date:
+                return None
+
+            expiry_timestamp = datetime.fromisoformat(expiry_date).timestamp()
+            secret_data['expiry_timestamp'] = expiry_timestamp
+
+        return expiry_timestamp
+
+
+    def _is_secret_expired(self, secret_data: Dict[str, Any], now: float = None) -> bool:
         """检查密钥是否过期"""
-        expiry_date = secret_data.get('expiry_date')
-        if not expiry_date:
+        expiry_timestamp = self._get_expiry_timestamp(secret_data)
+        if expiry_timestamp is None:
             return False
 
-        return datetime.now() > datetime.fromisoformat(expiry_date)
+        return (time.time() if now is None else now) > expiry_timestamp
 
 
-    def _days_until_expiry(self, secret_data: Dict[str, Any]) -> Optional[int]:
+    def _days_until_expiry(self, secret_data: Dict[str, Any], now: float = None) -> Optional[int]:
         """计算距离过期的天数"""
-        expiry_date = secret_data.get('expiry_date')
-        if not expiry_date:
+        expiry_timestamp = self._get_expiry_timestamp(secret_data)
+        if expiry_timestamp is None:
             return None
 
-        expiry_datetime = datetime.fromisoformat(expiry_date)
-        days_diff = (expiry_datetime - datetime.now()).days
+        seconds_left = expiry_timestamp - (time.time() if now is None else now)
 
-        return max(0, days_diff)
+        return max(0, int(seconds_left // 86400))
 
 
     def _log_access(self, operation: str, key: str, success: bool, details: str):
         """记录访问日志"""
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'operation': operation,
-            'key': key,
-            'success': success,
-            'details': details,
-            'session_id': st.session_state.get('session_id', 'unknown')
-        }
+        log_entry = AccessLogEntry(
+            time.time(), operation, key, success, details,
+            st.session_state.get('session_id', 'unknown')
+        )
 
+        # deque达到上限后自动丢弃最早的记录
         self.access_log.append(log_entry)
 
-        # 保持日志大小
-        if len(self.access_log) > 1000:
-            self.access_log = self.access_log[-500:]
-
 
     def get_access_log(self, limit: int = 50) -> List[Dict[str, Any]]:
         """获取访问日志"""
-        return self.access_log[-limit:]
+        start = max(0, len(self.access_log) - limit)
+        return [entry.to_dict() for entry in itertools.islice(self.access_log, start, None)]
 
 
     def get_security_summary(self) -> Dict[str, Any]:
@@ -405,7 +567,7 @@ class SecretsManager:
             'total_secrets': secrets_count,
             'expiring_secrets_count': len(expiring_secrets),
             'total_access_attempts': len(self.access_log),
-            'failed_access_attempts': sum(1 for log in self.access_log if not log['success']),
+            'failed_access_attempts': sum(1 for entry in self.access_log if not entry.success),
             'expiring_secrets': expiring_secrets
         }
 
@@ -2,27 +2,19 @@
 会话状态管理系统
 实现安全的会话状态管理和数据持久化
 """
+import heapq
 import json
-import hashlib
-import base64
 import os
+import re
+import secrets
+import time
 
 from typing import Any, Dict, Optional, List
 
-from datetime import datetime, timedelta
+from datetime import datetime
 import streamlit as st
 
-# 尝试导入加密模块
-try:
-    from cryptography.fernet import Fernet
-
-    from cryptography.hazmat.primitives import hashes
-
-    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-
-    CRYPTO_AVAILABLE = True
-except ImportError:
-    CRYPTO_AVAILABLE = False
+from .secrets_manager import CRYPTO_AVAILABLE, create_cipher, derive_default_key
 
 
 class SessionManager:
@@ -51,12 +43,23 @@ class SessionManager:
         self.active_sessions = {}
         self.session_data = {}
 
+        # 会话过期时间最小堆 (截止时间, 会话ID)，清理时只弹出已过期的会话；
+        # 活动更新会留下旧条目，以_session_deadlines中的最新截止时间为准
+        self._expiry_heap = []
+        self._session_deadlines = {}
+
         # 敏感数据字段
         self.sensitive_fields = {
             'api_key', 'password', 'token', 'secret', 'private_key',
             'access_token', 'refresh_token', 'session_key'
         }
 
+        # 敏感字段合并为一个忽略大小写的正则，一次扫描即可判断
+        self._sensitive_regex = re.compile(
+            '|'.join(re.escape(field) for field in sorted(self.sensitive_fields)),
+            re.IGNORECASE
+        )
+
 
     def _generate_encryption_key(self) -> str:
         """生成加密密钥"""
@@ -69,13 +72,7 @@ class SessionManager:
             # 生成新密钥（在生产环境中应该从安全存储中获取）
             password = b"default_session_key_change_in_production"
             salt = b"salt_1234567890123456"  # 在生产环境中应该是随机的
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=100000,
-            )
-            key = base64.urlsafe_b64encode(kdf.derive(password))
+            key = derive_default_key(password, salt)
 
         return key
 
@@ -90,7 +87,7 @@ class SessionManager:
         else:
             key = self.encryption_key
 
-        return Fernet(key)
+        return create_cipher(key)
 
 
     def create_session(self, user_id: str = None) -> str:
@@ -104,12 +101,13 @@ class SessionManager:
             会话ID
         """
         session_id = self._generate_session_id()
+        now = time.time()
 
         session_info = {
             'session_id': session_id,
             'user_id': user_id or 'anonymous',
-            'created_at': datetime.now().isoformat(),
-            'last_activity': datetime.now().isoformat(),
+            'created_at': now,
+            'last_activity': now,
             'ip_address': self._get_client_ip(),
             'user_agent': self._get_user_agent(),
             'is_active': True
@@ -117,32 +115,32 @@ class SessionManager:
 
         self.active_sessions[session_id] = session_info
         self.session_data[session_id] = {}
+        self._schedule_expiry(session_id, now)
 
         # 设置到Streamlit session state
         st.session_state.session_id = session_id
-        st.session_state.session_created_at = session_info['created_at']
+        st.session_state.session_created_at = datetime.fromtimestamp(now).isoformat()
 
         return session_id
 
 
     def get_session_id(self) -> str:
         """获取当前会话ID"""
-        if 'session_id' not in st.session_state:
-            return self.create_session()
+        # 只读取一次session state，后续复用同一个局部变量
+        session_id = st.session_state.get('session_id')
+        now = time.time()
 
-        session_id = st.session_state.session_id
-
-        # 验证会话是否有效
-        if not self.is_session_valid(session_id):
+        # 不存在或已失效时创建新会话
+        if session_id is None or not self.is_session_valid(session_id, now):
             return self.create_session()
 
         # 更新最后活动时间
-        self._update_last_activity(session_id)
+        self._update_last_activity(session_id, now)
 
         return session_id
 
 
-    def is_session_valid(self, session_id: str) -> bool:
+    def is_session_valid(self, session_id: str, now: float = None) -> bool:
         """检查会话是否有效"""
         if session_id not in self.active_sessions:
             return False
@@ -150,19 +148,21 @@ class SessionManager:
         session_info = self.active_sessions[session_id]
 
         # 检查会话是否过期
-        last_activity = datetime.fromisoformat(session_info['last_activity'])
-        if datetime.now() - last_activity > timedelta(seconds=self.session_timeout):
-            self.invalidate_session(session_id)
+        if now is None:
+            now = time.time()
+
+        if now - session_info['last_activity'] > self.session_timeout:
+            self.invalidate_session(session_id, now)
             return False
 
         return session_info.get('is_active', False)
 
 
-    def invalidate_session(self, session_id: str):
+    def invalidate_session(self, session_id: str, now: float = None):
         """使会话失效"""
         if session_id in self.active_sessions:
             self.active_sessions[session_id]['is_active'] = False
-            self.active_sessions[session_id]['invalidated_at'] = datetime.now().isoformat()
+            self.active_sessions[session_id]['invalidated_at'] = time.time() if now is None else now
 
         # 清理敏感数据
         if session_id in self.session_data:
@@ -181,10 +181,7 @@ class SessionManager:
         Returns:
             是否存储成功
         """
-        session_id = self.get_session_id()
-
-        if session_id not in self.session_data:
-            self.session_data[session_id] = {}
+        session_data = self.session_data.setdefault(self.get_session_id(), {})
 
         # 自动检测是否需要加密
         if encrypt is None:
@@ -192,23 +189,20 @@ class SessionManager:
 
         try:
             if encrypt and self.crypto_available and self.cipher_suite:
-                # 加密存储
+                # 加密存储（Fernet令牌本身就是URL安全的base64文本，无需再编码）
                 serialized_value = json.dumps(value, ensure_ascii=False)
                 encrypted_value = self.cipher_suite.encrypt(serialized_value.encode())
-                self.session_data[session_id][key] = {
+                session_data[key] = {
                     'encrypted': True,
-                    'value': base64.b64encode(encrypted_value).decode()
+                    'value': encrypted_value.decode('ascii')
                 }
             else:
                 # 明文存储（或加密不可用时的回退）
-                self.session_data[session_id][key] = {
+                session_data[key] = {
                     'encrypted': False,
                     'value': value
                 }
 
-            # 同时存储到Streamlit session state
-            st.session_state[key] = value
-
             return True
         except Exception:
             return False
@@ -225,21 +219,14 @@ class SessionManager:
         Returns:
             数据值
         """
-        session_id = self.get_session_id()
-
-        if session_id not in self.session_data:
-            return default
-
-        if key not in self.session_data[session_id]:
+        data_entry = self.session_data.get(self.get_session_id(), {}).get(key)
+        if data_entry is None:
             return default
 
         try:
-            data_entry = self.session_data[session_id][key]
-
             if data_entry['encrypted'] and self.crypto_available and self.cipher_suite:
                 # 解密数据
-                encrypted_value = base64.b64decode(data_entry['value'])
-                decrypted_value = self.cipher_suite.decrypt(encrypted_value)
+                decrypted_value = self.cipher_suite.decrypt(data_entry['value'].encode('ascii'))
                 return json.loads(decrypted_value.decode())
             else:
                 # 明文数据
@@ -263,10 +250,6 @@ class SessionManager:
         if session_id in self.session_data and key in self.session_data[session_id]:
             del self.session_data[session_id][key]
 
-            # 同时从Streamlit session state移除
-            if key in st.session_state:
-                del st.session_state[key]
-
             return True
 
         return False
@@ -282,6 +265,11 @@ class SessionManager:
 
         session_info = self.active_sessions[session_id].copy()
 
+        # 内部以时间戳存储，对外展示时转换为ISO格式
+        for field in ('created_at', 'last_activity', 'invalidated_at'):
+            if field in session_info:
+                session_info[field] = datetime.fromtimestamp(session_info[field]).isoformat()
+
         # 添加数据统计
         data_count = len(self.session_data.get(session_id, {}))
         encrypted_count = sum(
@@ -301,15 +289,19 @@ class SessionManager:
     def cleanup_expired_sessions(self) -> int:
         """清理过期会话"""
         expired_sessions = []
-        current_time = datetime.now()
+        current_time = time.time()
+        expiry_heap = self._expiry_heap
 
-        for session_id, session_info in self.active_sessions.items():
-            last_activity = datetime.fromisoformat(session_info['last_activity'])
-            if current_time - last_activity > timedelta(seconds=self.session_timeout):
-                expired_sessions.append(session_id)
+        # 只处理堆顶已过期的条目，跳过被后续活动刷新过的旧条目
+        while expiry_heap and expiry_heap[0][0] < current_time:
+            deadline, session_id = heapq.heappop(expiry_heap)
+            if self._session_deadlines.get(session_id) != deadline:
+                continue
+            del self._session_deadlines[session_id]
+            expired_sessions.append(session_id)
 
         for session_id in expired_sessions:
-            self.invalidate_session(session_id)
+            self.invalidate_session(session_id, current_time)
             if session_id in self.session_data:
                 del self.session_data[session_id]
 
@@ -317,36 +309,39 @@ class SessionManager:
 
 
     def _generate_session_id(self) -> str:
-        """生成会话ID"""
-        timestamp = datetime.now().isoformat()
-        random_data = os.urandom(16)
-        session_data = f"{timestamp}_{random_data.hex()}"
-        return hashlib.sha256(session_data.encode()).hexdigest()[:32]
+        """生成会话ID（32位十六进制，直接取自系统安全随机源）"""
+        return secrets.token_hex(16)
 
 
-    def _update_last_activity(self, session_id: str):
+    def _update_last_activity(self, session_id: str, now: float = None):
         """更新最后活动时间"""
         if session_id in self.active_sessions:
-            self.active_sessions[session_id]['last_activity'] = datetime.now().isoformat()
+            if now is None:
+                now = time.time()
+            self.active_sessions[session_id]['last_activity'] = now
+            self._schedule_expiry(session_id, now)
+
+
+    def _schedule_expiry(self, session_id: str, now: float):
+        """记录会话的过期截止时间"""
+        deadline = now + self.session_timeout
+        self._session_deadlines[session_id] = deadline
+        heapq.heappush(self._expiry_heap, (deadline, session_id))
+
+        # 旧条目过多时按最新截止时间重建堆，避免堆随活动次数无限增长
+        if len(self._expiry_heap) > 2 * len(self._session_deadlines) + 64:
+            self._expiry_heap = [(d, sid) for sid, d in self._session_deadlines.items()]
+            heapq.heapify(self._expiry_heap)
 
 
     def _is_sensitive_data(self, key: str, value: Any) -> bool:
         """检查是否为敏感数据"""
-        key_lower = key.lower()
-
         # 检查键名
-        for sensitive_field in self.sensitive_fields:
-            if sensitive_field in key_lower:
-                return True
+        if self._sensitive_regex.search(key):
+            return True
 
         # 检查值内容（如果是字符串）
-        if isinstance(value, str):
-            value_lower = value.lower()
-            for sensitive_field in self.sensitive_fields:
-                if sensitive_field in value_lower:
-                    return True
-
-        return False
+        return isinstance(value, str) and self._sensitive_regex.search(value) is not None
 
 
     def _clear_sensitive_data(self, session_id: str):
@@ -368,8 +363,7 @@ class SessionManager:
         if session_id not in self.active_sessions:
             return 0
 
-        created_at = datetime.fromisoformat(self.active_sessions[session_id]['created_at'])
-        return int((datetime.now() - created_at).total_seconds())
+        return int(time.time() - self.active_sessions[session_id]['created_at'])
 
 
     def _get_client_ip(self) -> str:
@@ -4,25 +4,146 @@
 验证输入验证、认证授权、数据加密等安全措施
 """
 
+import os
 import re
 import ast
 import json
 
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+
 from pathlib import Path
 
 from typing import Dict, List, Any
 
 from datetime import datetime
 
+# 尝试导入orjson（更快的JSON序列化），不可用时回退到标准库json
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 尝试导入RE2（线性时间匹配，不会因回溯在恶意构造的长行上退化），不可用时回退到标准库re
+try:
+    import re2
+
+    RE2_AVAILABLE = True
+    _RE2_OPTIONS = re2.Options()
+    _RE2_OPTIONS.log_errors = False
+    # 按单字节匹配，与标准库bytes正则的语义一致
+    _RE2_OPTIONS.encoding = re2.Options.Encoding.LATIN1
+except ImportError:
+    RE2_AVAILABLE = False
+
+# 文件数达到该值时才使用多进程分析（进程启动开销高于小项目的扫描耗时）
+PARALLEL_MIN_FILES = 32
+
+
+def _compile_bytes(pattern):
+    """将(ASCII)模式编译为bytes正则，直接匹配未解码的源码行"""
+    return re.compile(pattern.encode('ascii'))
+
+
+def _compile_linear(pattern):
+    """编译逐行确认用的模式：优先使用RE2，RE2不支持的语法（如前瞻）逐个回退到标准库"""
+    if RE2_AVAILABLE:
+        try:
+            return re2.compile(pattern.encode('ascii'), _RE2_OPTIONS)
+        except re2.error:
+            pass
+    return _compile_bytes(pattern)
+
+
+def _keyword_regex(keywords):
+    """将关键字列表编译为零宽前瞻分支正则，一次扫描找出行内出现的所有关键字"""
+    return _compile_bytes('(?=(' + '|'.join(re.escape(keyword) for keyword in keywords) + '))')
+
+
+def _find_keywords(regex, keywords, text):
+    """按关键字列表顺序返回文本中出现的关键字"""
+    found = {match.group(1).decode('ascii') for match in regex.finditer(text)}
+    return [keyword for keyword in keywords if keyword in found] if found else []
+
+
+def _fuse_patterns(patterns):
+    """
+    将(已编译模式, 描述)列表合并为一个零宽前瞻分支正则，用于整个文件的单次扫描预筛选
+
+    使用零宽匹配，跨行的候选匹配不会吞掉其后同一行中的真实命中；
+    RE2不支持前瞻，合并正则始终由标准库re编译
+    """
+    return re.compile(b'(?=' + b'|'.join(b'(?:' + pattern.pattern + b')' for pattern, _ in patterns) + b')')
+
+
+def _matching_lines(regex, data):
+    """在整个文件内容上运行正则，按顺序生成命中所在的行号（从0开始，同一行只生成一次）"""
+    line_index = 0
+    last_pos = 0
+    last_line = -1
+
+    for match in regex.finditer(data):
+        # 只统计上次命中之后新增的换行符，整体仍是一次线性扫描
+        pos = match.start()
+        line_index += data.count(b'\n', last_pos, pos)
+        last_pos = pos
+
+        if line_index != last_line:
+            last_line = line_index
+            yield line_index
+
+
+def _decode_line(line):
+    """解码源码行用于报告（只对命中的行解码）"""
+    return line.decode('utf-8', 'replace').strip()
+
 
 class SecurityChecker:
     """安全性检查器"""
 
+    # 扫描时跳过的目录
+    EXCLUDED_DIRS = frozenset({'__pycache__', '.git', 'venv', 'env', '.venv', 'node_modules'})
+
+    # 各项分析的结果分类：{分类: (条目字段, 固定字段)}
+    # 扫描时条目保存为元组（比字典小，进程间传递也更快），合并后再按字段名转换为字典
+    RESULT_BUCKETS = {
+        "input_validation": {
+            "user_inputs": (("file", "line", "code"), {}),
+            "validated_inputs": (("file", "line", "validation_line"), {}),
+            "unvalidated_inputs": (("file", "line"), {"issue": "用户输入未验证"}),
+            "validation_patterns": (("file", "line", "pattern", "code"), {}),
+            "sanitization_found": (("file", "line"), {"practice": "数据清理操作"})
+        },
+        "auth_analysis": {
+            "auth_mechanisms": (("file", "line"), {"mechanism": "认证机制"}),
+            "jwt_usage": (("file", "line", "code"), {}),
+            "session_management": (("file", "line"), {"type": "会话管理相关"}),
+            "permission_checks": (("file", "line"), {"type": "权限检查"}),
+            "auth_vulnerabilities": (("file", "line"), {"vulnerability": "明文密码比较", "suggestion": "使用哈希比较"})
+        },
+        "encryption_analysis": {
+            "encryption_usage": (("file", "line", "library"), {}),
+            "weak_encryption": (("file", "line", "algorithm"), {"suggestion": "使用更强的加密算法"}),
+            "strong_encryption": (("file", "line", "algorithm"), {}),
+            "key_management": (("file", "line"), {"practice": "安全的密钥管理"}),
+            "ssl_tls_usage": (("file", "line"), {"usage": "SSL/TLS使用"})
+        },
+        "vulnerability_analysis": {
+            "high_risk_issues": (("file", "line", "issue", "code"), {"severity": "high"}),
+            "medium_risk_issues": (("file", "line", "issue", "code"), {"severity": "medium"}),
+            "low_risk_issues": (("file", "line", "issue", "code"), {"severity": "low"}),
+            "sensitive_data_exposure": (("file", "line", "issue", "code"), {}),
+            "injection_risks": (("file", "line", "issue", "code"), {})
+        }
+    }
+
 
     def __init__(self):
         self.project_root = Path(".")
         self.python_files = []
         self.results = {}
+        self._files_analyzed = False
 
         # 安全风险模式
         self.security_patterns = {
@@ -59,94 +180,259 @@ class SecurityChecker:
             (r'["\'][A-Za-z0-9]{32,}["\']', '可能的硬编码密钥'),
         ]
 
+        # 注入风险模式
+        self.injection_patterns = [
+            (r'\.format\s*\([^)]*input', 'SQL注入风险'),
+            (r'%\s*[^)]*input', '字符串格式化注入'),
+            (r'f["\'][^"\']*{[^}]*input', 'f-string注入风险')
+        ]
+
+        # 所有模式在初始化时编译一次，逐行扫描时直接复用；
+        # 源码以bytes读取，省去整文件的UTF-8解码，模式也编译为bytes正则（可用时由RE2执行）
+        self.security_patterns = {
+            level: [(_compile_linear(pattern), description) for pattern, description in patterns]
+            for level, patterns in self.security_patterns.items()
+        }
+        self.sensitive_patterns = [
+            (_compile_linear(pattern), description) for pattern, description in self.sensitive_patterns
+        ]
+        self.injection_patterns = [
+            (_compile_linear(pattern), description) for pattern, description in self.injection_patterns
+        ]
+        self.user_input_re = _compile_bytes(r'\binput\s*\(')
+        self.plain_password_compare_re = _compile_bytes(r'password\s*==\s*["\']')
+
+        # 每个类别的模式再合并为一个正则，在整个文件上扫描一次找出候选行，
+        # 命中的行才逐个模式确认（合并正则在同一位置只报告第一个分支，不能直接用来分派）
+        self.security_prefilters = {
+            level: _fuse_patterns(patterns) for level, patterns in self.security_patterns.items()
+        }
+        self.sensitive_prefilter = _fuse_patterns(self.sensitive_patterns)
+        self.injection_prefilter = _fuse_patterns(self.injection_patterns)
+
+        # 预筛选关键字：类别中每个模式命中时都必然包含其中之一，文件中一个都没有时
+        # 用bytes子串查找(memmem)即可跳过整个类别的正则扫描。
+        # 敏感信息类别包含"任意引号字符串"模式，几乎每个文件都会命中，不做预筛选
+        self.prescreen_triggers = {
+            "high_risk": (b'eval', b'exec', b'os.system', b'subprocess', b'pickle.load', b'yaml.load'),
+            "medium_risk": (b'open', b'requests.', b'urllib.request.urlopen', b'random.random()',
+                            b'hashlib.md5()', b'hashlib.sha1()'),
+            "low_risk": (b'input', b'print', b'logging.'),
+            "injection": (b'input',)
+        }
+
+        # 关键字扫描：每组关键字编译为一个正则，单次扫描代替逐个子串查找
+        self.validation_keywords = ['validate', 'sanitize', 'escape', 'filter']
+        self.encryption_libs = ['cryptography', 'pycrypto', 'hashlib', 'ssl']
+        self.weak_encryption_keywords = ['md5', 'sha1', 'des', 'rc4']
+        self.strong_encryption_keywords = ['aes', 'sha256', 'sha512', 'rsa', 'ecdsa']
+
+        self.validation_keywords_re = _keyword_regex(self.validation_keywords)
+        self.encryption_libs_re = _keyword_regex(self.encryption_libs)
+        self.weak_encryption_re = _keyword_regex(self.weak_encryption_keywords)
+        self.strong_encryption_re = _keyword_regex(self.strong_encryption_keywords)
+        self.validation_check_re = _keyword_regex(['validate', 'check', 'verify', 'isinstance', 'len('])
+        self.sanitization_re = _keyword_regex(['html.escape', 're.sub', 'strip()', 'replace('])
+        self.session_keywords_re = _keyword_regex(['session', 'cookie', 'login', 'logout'])
+        self.permission_keywords_re = _keyword_regex(['permission', 'authorize', 'access', 'role'])
+        self.auth_mechanism_re = _keyword_regex(['authenticate', 'verify_token', 'check_auth'])
+        self.key_keywords_re = _keyword_regex(['key', 'secret', 'password'])
+        self.secure_key_source_re = _keyword_regex(['os.environ', 'getenv', 'config'])
+        self.ssl_tls_re = _keyword_regex(['https://', 'ssl', 'tls', 'verify=True'])
+
 
     def scan_files(self):
         """扫描Python文件"""
         print("🔍 扫描Python文件...")
 
-        exclude_patterns = ['__pycache__', '.git', 'venv', 'env']
-
-        for file_path in self.project_root.rglob("*.py"):
-            if not any(pattern in str(file_path) for pattern in exclude_patterns):
-                self.python_files.append(file_path)
+        # 遍历时直接剪掉排除的目录，不再进入虚拟环境等大目录逐个检查文件
+        for dir_path, dir_names, file_names in os.walk(self.project_root):
+            dir_names[:] = [name for name in dir_names if name not in self.EXCLUDED_DIRS]
+            for file_name in file_names:
+                if file_name.endswith('.py'):
+                    self.python_files.append(Path(dir_path) / file_name)
 
         print(f"📁 找到 {len(self.python_files)} 个Python文件")
 
 
+    def _analyze_file(self, file_path):
+        """读取单个文件一次并运行全部检查，返回(各项分析结果, 错误信息列表)"""
+        file_results = {
+            key: {bucket: [] for bucket in buckets}
+            for key, buckets in self.RESULT_BUCKETS.items()
+        }
+        errors = []
+
+        # 按字节读取，通用换行符(\r\n、\r)统一为\n后分行，只有命中的行才解码
+        try:
+            data = file_path.read_bytes()
+            if b'\r' in data:
+                data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+            lines = data.split(b'\n')
+
+            # 路径字符串每个文件只生成一次，所有结果条目共用
+            path_str = str(file_path)
+            self._scan_lines(path_str, lines, file_results)
+            self._scan_patterns(path_str, data, lines, file_results["vulnerability_analysis"])
+        except Exception as e:
+            errors.append(f"文件分析失败 {file_path}: {e}")
+
+        return file_results, errors
+
+
+    def _analyze_files(self):
+        """分析所有文件（每个文件只读取一次），文件较多时分发到多个进程并行处理"""
+        if self._files_analyzed:
+            return
+        self._files_analyzed = True
+
+        all_file_results = None
+        if len(self.python_files) >= PARALLEL_MIN_FILES and (os.cpu_count() or 1) > 1:
+            try:
+                with ProcessPoolExecutor(initializer=_init_worker) as pool:
+                    all_file_results = list(pool.map(analyze_file, self.python_files, chunksize=16))
+            except (OSError, BrokenExecutor) as e:
+                print(f"⚠️ 多进程分析不可用，改为顺序分析: {e}")
+
+        if all_file_results is None:
+            all_file_results = [self._analyze_file(file_path) for file_path in self.python_files]
+
+        for file_results, errors in all_file_results:
+            for message in errors:
+                print(f"⚠️ {message}")
+
+        # 按文件顺序合并（结果顺序与顺序分析一致），并把元组条目转换为报告使用的字典
+        for key, buckets in self.RESULT_BUCKETS.items():
+            self.results[key] = {
+                bucket: [
+                    {**dict(zip(fields, entry)), **extra_fields}
+                    for file_results, _ in all_file_results
+                    for entry in file_results[key][bucket]
+                ]
+                for bucket, (fields, extra_fields) in buckets.items()
+            }
+
+
+    def _scan_lines(self, path_str, lines, file_results):
+        """单次遍历文件的所有行，同时完成输入验证、认证授权和数据加密检查"""
+        validation_analysis = file_results["input_validation"]
+        auth_analysis = file_results["auth_analysis"]
+        encryption_analysis = file_results["encryption_analysis"]
+
+        for i, line in enumerate(lines):
+            stripped_line = line.strip()
+            # 小写形式每行只计算一次，供所有不区分大小写的关键字检查共用
+            line_lower = stripped_line.lower()
+
+            # 检查用户输入
+            if self.user_input_re.search(stripped_line):
+                validation_analysis["user_inputs"].append((path_str, i + 1, _decode_line(line)))
+
+                # 检查后续4行是否有验证：拼接后一次搜索，再由命中位置前的换行数得到所在行
+                following_lines = b'\n'.join(lines[i + 1:i + 5])
+                match = self.validation_check_re.search(following_lines)
+                if match:
+                    j = i + 1 + following_lines.count(b'\n', 0, match.start())
+                    validation_analysis["validated_inputs"].append((path_str, i + 1, j + 1))
+                else:
+                    validation_analysis["unvalidated_inputs"].append((path_str, i + 1))
+
+            # 检查验证模式
+            for keyword in _find_keywords(self.validation_keywords_re, self.validation_keywords, line_lower):
+                validation_analysis["validation_patterns"].append(
+                    (path_str, i + 1, keyword, _decode_line(line))
+                )
+
+            # 检查数据清理
+            if self.sanitization_re.search(stripped_line):
+                validation_analysis["sanitization_found"].append((path_str, i + 1))
+
+            # 检查JWT使用
+            if b'jwt' in line_lower:
+                auth_analysis["jwt_usage"].append((path_str, i + 1, _decode_line(line)))
+
+            # 检查会话管理
+            if self.session_keywords_re.search(line_lower):
+                auth_analysis["session_management"].append((path_str, i + 1))
+
+            # 检查权限检查
+            if self.permission_keywords_re.search(line_lower):
+                auth_analysis["permission_checks"].append((path_str, i + 1))
+
+            # 检查认证机制
+            if self.auth_mechanism_re.search(stripped_line):
+                auth_analysis["auth_mechanisms"].append((path_str, i + 1))
+
+            # 检查认证漏洞
+            if self.plain_password_compare_re.search(stripped_line):
+                auth_analysis["auth_vulnerabilities"].append((path_str, i + 1))
+
+            # 检查加密库使用
+            for lib in _find_keywords(self.encryption_libs_re, self.encryption_libs, stripped_line):
+                encryption_analysis["encryption_usage"].append((path_str, i + 1, lib))
+
+            # 检查弱加密
+            for pattern in _find_keywords(self.weak_encryption_re, self.weak_encryption_keywords, line_lower):
+                encryption_analysis["weak_encryption"].append((path_str, i + 1, pattern))
+
+            # 检查强加密
+            for pattern in _find_keywords(self.strong_encryption_re, self.strong_encryption_keywords,
+                                          line_lower):
+                encryption_analysis["strong_encryption"].append((path_str, i + 1, pattern))
+
+            # 检查密钥管理
+            if self.key_keywords_re.search(line_lower):
+                if self.secure_key_source_re.search(stripped_line):
+                    encryption_analysis["key_management"].append((path_str, i + 1))
+
+            # 检查SSL/TLS
+            if self.ssl_tls_re.search(stripped_line):
+                encryption_analysis["ssl_tls_usage"].append((path_str, i + 1))
+
+
+    def _scan_patterns(self, path_str, data, lines, vulnerability_analysis):
+        """在整个文件内容上运行各类别的合并正则，只对命中的行逐个模式确认"""
+        # 检查高、中、低风险问题
+        for level in ("high_risk", "medium_risk", "low_risk"):
+            if not any(trigger in data for trigger in self.prescreen_triggers[level]):
+                continue
+
+            issues = vulnerability_analysis[f"{level}_issues"]
+
+            for i in _matching_lines(self.security_prefilters[level], data):
+                stripped_line = lines[i].strip()
+                for pattern, description in self.security_patterns[level]:
+                    if pattern.search(stripped_line):
+                        issues.append((path_str, i + 1, description, _decode_line(lines[i])))
+
+        # 检查敏感数据暴露
+        for i in _matching_lines(self.sensitive_prefilter, data):
+            stripped_line = lines[i].strip()
+            for pattern, description in self.sensitive_patterns:
+                if pattern.search(stripped_line):
+                    vulnerability_analysis["sensitive_data_exposure"].append(
+                        (path_str, i + 1, description, _decode_line(lines[i])[:50] + "...")
+                    )
+
+        # 检查注入风险
+        if not any(trigger in data for trigger in self.prescreen_triggers["injection"]):
+            return
+
+        for i in _matching_lines(self.injection_prefilter, data):
+            stripped_line = lines[i].strip()
+            for pattern, description in self.injection_patterns:
+                if pattern.search(stripped_line):
+                    vulnerability_analysis["injection_risks"].append(
+                        (path_str, i + 1, description, _decode_line(lines[i]))
+                    )
+
+
     def check_input_validation(self):
         """检查输入验证"""
         print("\n🛡️ 检查输入验证...")
 
-        validation_analysis = {
-            "user_inputs": [],
-            "validated_inputs": [],
-            "unvalidated_inputs": [],
-            "validation_patterns": [],
-            "sanitization_found": []
-        }
-
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-
-                for i, line in enumerate(lines):
-                    stripped_line = line.strip()
-
-                    # 检查用户输入
-                    if re.search(r'\binput\s*\(', stripped_line):
-                        validation_analysis["user_inputs"].append({
-                            "file": str(file_path),
-                            "line": i + 1,
-                            "code": stripped_line
-                        })
-
-                        # 检查后续行是否有验证
-                        has_validation = False
-                        for j in range(i + 1, min(i + 5, len(lines))):
-                            next_line = lines[j].strip()
-                            if any(pattern in next_line for pattern in
-                                  ['validate', 'check', 'verify', 'isinstance', 'len(']):
-                                has_validation = True
-                                validation_analysis["validated_inputs"].append({
-                                    "file": str(file_path),
-                                    "line": i + 1,
-                                    "validation_line": j + 1
-                                })
-                                break
-
-                        if not has_validation:
-                            validation_analysis["unvalidated_inputs"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "issue": "用户输入未验证"
-                            })
-
-                    # 检查验证模式
-                    validation_keywords = ['validate', 'sanitize', 'escape', 'filter']
-                    for keyword in validation_keywords:
-                        if keyword in stripped_line.lower():
-                            validation_analysis["validation_patterns"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "pattern": keyword,
-                                "code": stripped_line
-                            })
-
-                    # 检查数据清理
-                    if any(pattern in stripped_line for pattern in
-                          ['html.escape', 're.sub', 'strip()', 'replace(']):
-                        validation_analysis["sanitization_found"].append({
-                            "file": str(file_path),
-                            "line": i + 1,
-                            "practice": "数据清理操作"
-                        })
-
-            except Exception as e:
-                print(f"⚠️ 输入验证检查失败 {file_path}: {e}")
-
-        self.results["input_validation"] = validation_analysis
+        self._analyze_files()
+        validation_analysis = self.results["input_validation"]
 
         print(f"📊 输入验证分析:")
         print(f"  - 用户输入点: {len(validation_analysis['user_inputs'])}")
@@ -159,71 +445,8 @@ class SecurityChecker:
         """检查认证和授权"""
         print("\n🔐 检查认证和授权...")
 
-        auth_analysis = {
-            "auth_mechanisms": [],
-            "jwt_usage": [],
-            "session_management": [],
-            "permission_checks": [],
-            "auth_vulnerabilities": []
-        }
-
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-
-                for i, line in enumerate(lines):
-                    stripped_line = line.strip()
-
-                    # 检查JWT使用
-                    if 'jwt' in stripped_line.lower():
-                        auth_analysis["jwt_usage"].append({
-                            "file": str(file_path),
-                            "line": i + 1,
-                            "code": stripped_line
-                        })
-
-                    # 检查会话管理
-                    if any(pattern in stripped_line.lower() for pattern in
-                          ['session', 'cookie', 'login', 'logout']):
-                        auth_analysis["session_management"].append({
-                            "file": str(file_path),
-                            "line": i + 1,
-                            "type": "会话管理相关"
-                        })
-
-                    # 检查权限检查
-                    if any(pattern in stripped_line.lower() for pattern in
-                          ['permission', 'authorize', 'access', 'role']):
-                        auth_analysis["permission_checks"].append({
-                            "file": str(file_path),
-                            "line": i + 1,
-                            "type": "权限检查"
-                        })
-
-                    # 检查认证机制
-                    if any(pattern in stripped_line for pattern in
-                          ['authenticate', 'verify_token', 'check_auth']):
-                        auth_analysis["auth_mechanisms"].append({
-                            "file": str(file_path),
-                            "line": i + 1,
-                            "mechanism": "认证机制"
-                        })
-
-                    # 检查认证漏洞
-                    if re.search(r'password\s*==\s*["\']', stripped_line):
-                        auth_analysis["auth_vulnerabilities"].append({
-                            "file": str(file_path),
-                            "line": i + 1,
-                            "vulnerability": "明文密码比较",
-                            "suggestion": "使用哈希比较"
-                        })
-
-            except Exception as e:
-                print(f"⚠️ 认证检查失败 {file_path}: {e}")
-
-        self.results["auth_analysis"] = auth_analysis
+        self._analyze_files()
+        auth_analysis = self.results["auth_analysis"]
 
         print(f"📊 认证授权分析:")
         print(f"  - 认证机制: {len(auth_analysis['auth_mechanisms'])}")
@@ -237,78 +460,8 @@ class SecurityChecker:
         """检查数据加密"""
         print("\n🔒 检查数据加密...")
 
-        encryption_analysis = {
-            "encryption_usage": [],
-            "weak_encryption": [],
-            "strong_encryption": [],
-            "key_management": [],
-            "ssl_tls_usage": []
-        }
-
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-
-                for i, line in enumerate(lines):
-                    stripped_line = line.strip()
-
-                    # 检查加密库使用
-                    encryption_libs = ['cryptography', 'pycrypto', 'hashlib', 'ssl']
-                    for lib in encryption_libs:
-                        if lib in stripped_line:
-                            encryption_analysis["encryption_usage"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "library": lib
-                            })
-
-                    # 检查弱加密
-                    weak_patterns = ['md5', 'sha1', 'des', 'rc4']
-                    for pattern in weak_patterns:
-                        if pattern in stripped_line.lower():
-                            encryption_analysis["weak_encryption"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "algorithm": pattern,
-                                "suggestion": "使用更强的加密算法"
-                            })
-
-                    # 检查强加密
-                    strong_patterns = ['aes', 'sha256', 'sha512', 'rsa', 'ecdsa']
-                    for pattern in strong_patterns:
-                        if pattern in stripped_line.lower():
-                            encryption_analysis["strong_encryption"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "algorithm": pattern
-                            })
-
-                    # 检查密钥管理
-                    if any(pattern in stripped_line.lower() for pattern in
-                          ['key', 'secret', 'password']):
-                        if any(secure_pattern in stripped_line for secure_pattern in
-                              ['os.environ', 'getenv', 'config']):
-                            encryption_analysis["key_management"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "practice": "安全的密钥管理"
-                            })
-
-                    # 检查SSL/TLS
-                    if any(pattern in stripped_line for pattern in
-                          ['https://', 'ssl', 'tls', 'verify=True']):
-                        encryption_analysis["ssl_tls_usage"].append({
-                            "file": str(file_path),
-                            "line": i + 1,
-                            "usage": "SSL/TLS使用"
-                        })
-
-            except Exception as e:
-                print(f"⚠️ 加密检查失败 {file_path}: {e}")
-
-        self.results["encryption_analysis"] = encryption_analysis
+        self._analyze_files()
+        encryption_analysis = self.results["encryption_analysis"]
 
         print(f"📊 数据加密分析:")
         print(f"  - 加密库使用: {len(encryption_analysis['encryption_usage'])}")
@@ -322,86 +475,8 @@ class SecurityChecker:
         """检查安全漏洞"""
         print("\n🚨 检查安全漏洞...")
 
-        vulnerability_analysis = {
-            "high_risk_issues": [],
-            "medium_risk_issues": [],
-            "low_risk_issues": [],
-            "sensitive_data_exposure": [],
-            "injection_risks": []
-        }
-
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-
-                for i, line in enumerate(lines):
-                    stripped_line = line.strip()
-
-                    # 检查高风险问题
-                    for pattern, description in self.security_patterns["high_risk"]:
-                        if re.search(pattern, stripped_line):
-                            vulnerability_analysis["high_risk_issues"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "issue": description,
-                                "code": stripped_line,
-                                "severity": "high"
-                            })
-
-                    # 检查中风险问题
-                    for pattern, description in self.security_patterns["medium_risk"]:
-                        if re.search(pattern, stripped_line):
-                            vulnerability_analysis["medium_risk_issues"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "issue": description,
-                                "code": stripped_line,
-                                "severity": "medium"
-                            })
-
-                    # 检查低风险问题
-                    for pattern, description in self.security_patterns["low_risk"]:
-                        if re.search(pattern, stripped_line):
-                            vulnerability_analysis["low_risk_issues"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "issue": description,
-                                "code": stripped_line,
-                                "severity": "low"
-                            })
-
-                    # 检查敏感数据暴露
-                    for pattern, description in self.sensitive_patterns:
-                        if re.search(pattern, stripped_line):
-                            vulnerability_analysis["sensitive_data_exposure"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "issue": description,
-                                "code": stripped_line[:50] + "..."
-                            })
-
-                    # 检查注入风险
-                    injection_patterns = [
-                        (r'\.format\s*\([^)]*input', 'SQL注入风险'),
-                        (r'%\s*[^)]*input', '字符串格式化注入'),
-                        (r'f["\'][^"\']*{[^}]*input', 'f-string注入风险')
-                    ]
-
-                    for pattern, description in injection_patterns:
-                        if re.search(pattern, stripped_line):
-                            vulnerability_analysis["injection_risks"].append({
-                                "file": str(file_path),
-                                "line": i + 1,
-                                "issue": description,
-                                "code": stripped_line
-                            })
-
-            except Exception as e:
-                print(f"⚠️ 漏洞检查失败 {file_path}: {e}")
-
-        self.results["vulnerability_analysis"] = vulnerability_analysis
+        self._analyze_files()
+        vulnerability_analysis = self.results["vulnerability_analysis"]
 
         print(f"📊 安全漏洞分析:")
         print(f"  - 高风险问题: {len(vulnerability_analysis['high_risk_issues'])}")
@@ -418,19 +493,22 @@ class SecurityChecker:
         print("="*60)
 
         total_files = len(self.python_files)
+        vulnerability_analysis = self.results["vulnerability_analysis"]
+
+        # 各类计数只取一次，评分、统计输出和摘要共用
+        high_risk_count = len(vulnerability_analysis["high_risk_issues"])
+        medium_risk_count = len(vulnerability_analysis["medium_risk_issues"])
+        low_risk_count = len(vulnerability_analysis["low_risk_issues"])
+        unvalidated_count = len(self.results["input_validation"]["unvalidated_inputs"])
 
         # 计算安全分数
-        total_vulnerabilities = (
-            len(self.results["vulnerability_analysis"]["high_risk_issues"]) +
-            len(self.results["vulnerability_analysis"]["medium_risk_issues"]) +
-            len(self.results["vulnerability_analysis"]["low_risk_issues"])
-        )
+        total_vulnerabilities = high_risk_count + medium_risk_count + low_risk_count
 
         security_score = max(0, 100 - (
-            len(self.results["vulnerability_analysis"]["high_risk_issues"]) * 20 +
-            len(self.results["vulnerability_analysis"]["medium_risk_issues"]) * 10 +
-            len(self.results["vulnerability_analysis"]["low_risk_issues"]) * 5 +
-            len(self.results["input_validation"]["unvalidated_inputs"]) * 3
+            high_risk_count * 20 +
+            medium_risk_count * 10 +
+            low_risk_count * 5 +
+            unvalidated_count * 3
         ))
 
         print(f"📊 安全评分: {security_score:.1f}/100")
@@ -443,10 +521,10 @@ class SecurityChecker:
         print(f"  - 加密使用: {len(self.results['encryption_analysis']['encryption_usage'])}")
 
         print(f"\n⚠️ 安全风险:")
-        print(f"  - 高风险: {len(self.results['vulnerability_analysis']['high_risk_issues'])}")
-        print(f"  - 中风险: {len(self.results['vulnerability_analysis']['medium_risk_issues'])}")
-        print(f"  - 低风险: {len(self.results['vulnerability_analysis']['low_risk_issues'])}")
-        print(f"  - 敏感数据暴露: {len(self.results['vulnerability_analysis']['sensitive_data_exposure'])}")
+        print(f"  - 高风险: {high_risk_count}")
+        print(f"  - 中风险: {medium_risk_count}")
+        print(f"  - 低风险: {low_risk_count}")
+        print(f"  - 敏感数据暴露: {len(vulnerability_analysis['sensitive_data_exposure'])}")
 
         # 保存详细结果
         self.results["summary"] = {
@@ -456,8 +534,13 @@ class SecurityChecker:
             "total_vulnerabilities": total_vulnerabilities
         }
 
-        with open("security_analysis_report.json", "w", encoding="utf-8") as f:
-            json.dump(self.results, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            Path("security_analysis_report.json").write_bytes(
+                orjson.dumps(self.results, option=orjson.OPT_INDENT_2)
+            )
+        else:
+            with open("security_analysis_report.json", "w", encoding="utf-8") as f:
+                json.dump(self.results, f, indent=2, ensure_ascii=False)
 
         print(f"\n💾 详细报告已保存到: security_analysis_report.json")
 
@@ -474,6 +557,21 @@ class SecurityChecker:
         return self.generate_report()
 
 
+# 工作进程中的检查器实例（编译好的正则在每个进程内构建一次，不跨进程传递）
+_worker_checker = None
+
+
+def _init_worker():
+    """进程池初始化函数"""
+    global _worker_checker
+    _worker_checker = SecurityChecker()
+
+
+def analyze_file(file_path):
+    """在工作进程中分析单个文件"""
+    return _worker_checker._analyze_file(file_path)
+
+
 def main():
     checker = SecurityChecker()
     return checker.run_analysis()
@@ -32,26 +32,29 @@ async def test_basic_functionality():
     ]
     
     print("\n📝 搜索判断测试:")
-    for query in test_queries:
-        should_search = search_engine.should_search(query)
+    for query, should_search in zip(test_queries, search_engine.should_search_many(test_queries)):
         status = "✅ 需要搜索" if should_search else "❌ 不需要搜索"
         print(f"  '{query}' -> {status}")
     
     # 测试模拟搜索
     print("\n🌐 模拟搜索测试:")
-    test_query = "Python 3.12 新特性"
-    print(f"搜索查询: {test_query}")
+    mock_queries = ["Python 3.12 新特性", "最新科技新闻"]
     
     try:
-        results = await search_engine._search_mock(test_query, 3)
-        if results:
-            print(f"✅ 找到 {len(results)} 个模拟结果:")
-            for i, result in enumerate(results, 1):
-                print(f"  {i}. {result['title']}")
-                print(f"     来源: {result['source']}")
-                print()
-        else:
-            print("❌ 未找到搜索结果")
+        # 并发执行所有模拟搜索，总耗时约等于单次延迟
+        all_results = await asyncio.gather(
+            *[search_engine._search_mock(query, 3) for query in mock_queries]
+        )
+        for test_query, results in zip(mock_queries, all_results):
+            print(f"搜索查询: {test_query}")
+            if results:
+                print(f"✅ 找到 {len(results)} 个模拟结果:")
+                for i, result in enumerate(results, 1):
+                    print(f"  {i}. {result['title']}")
+                    print(f"     来源: {result['source']}")
+                    print()
+            else:
+                print("❌ 未找到搜索结果")
     except Exception as e:
         print(f"❌ 搜索失败: {e}")
 
@@ -76,8 +79,8 @@ def test_search_keywords():
     correct = 0
     total = len(test_cases)
     
-    for query, expected in test_cases:
-        result = search_engine.should_search(query)
+    queries = [query for query, _ in test_cases]
+    for (query, expected), result in zip(test_cases, search_engine.should_search_many(queries)):
         status = "✅" if result == expected else "❌"
         print(f"  {status} '{query}' -> {'需要' if result else '不需要'}搜索 (期望: {'需要' if expected else '不需要'})")
         if result == expected:
@@ -1,10 +1,27 @@
 """
 简单系统测试脚本 - 不依赖外部库
 """
+import functools
 import os
 import sys
 
 
+@functools.lru_cache(maxsize=None)
+def dir_entries(dir_path):
+    """列出目录下的所有条目名（每个目录只扫描一次）"""
+    try:
+        with os.scandir(dir_path) as entries:
+            return frozenset(entry.name for entry in entries)
+    except OSError:
+        return frozenset()
+
+
+def path_exists(path):
+    """通过缓存的目录列表判断相对路径是否存在，代替逐个调用os.path.exists"""
+    parent, name = os.path.split(path)
+    return name in dir_entries(parent or ".")
+
+
 def test_project_structure():
     """测试项目结构"""
     print("🏗️ 测试项目结构...")
@@ -25,7 +42,7 @@ def test_project_structure():
 
     missing_files = []
     for file_path in required_files:
-        if not os.path.exists(file_path):
+        if not path_exists(file_path):
             missing_files.append(file_path)
 
     if missing_files:
@@ -42,7 +59,7 @@ def test_configuration():
 
     try:
         # 检查.env.example文件
-        if os.path.exists(".env.example"):
+        if path_exists(".env.example"):
             with open(".env.example", "r", encoding="utf-8") as f:
                 content = f.read()
                 if "OPENAI_API_KEY" in content:
@@ -55,7 +72,7 @@ def test_configuration():
             return False
 
         # 检查requirements.txt
-        if os.path.exists("requirements.txt"):
+        if path_exists("requirements.txt"):
             with open("requirements.txt", "r", encoding="utf-8") as f:
                 content = f.read()
                 required_packages = ["langchain", "openai", "streamlit", "chromadb"]
@@ -83,7 +100,7 @@ def test_docker_config():
 
     try:
         # 检查Dockerfile
-        if os.path.exists("Dockerfile"):
+        if path_exists("Dockerfile"):
             with open("Dockerfile", "r", encoding="utf-8") as f:
                 content = f.read()
                 if "FROM python:" in content and "streamlit" in content:
@@ -96,7 +113,7 @@ def test_docker_config():
             return False
 
         # 检查docker-compose.yml
-        if os.path.exists("docker-compose.yml"):
+        if path_exists("docker-compose.yml"):
             with open("docker-compose.yml", "r", encoding="utf-8") as f:
                 content = f.read()
                 if "multimodal-agent" in content and "chromadb" in content:
@@ -121,13 +138,13 @@ def test_startup_scripts():
 
     scripts_exist = True
 
-    if os.path.exists("start.sh"):
+    if path_exists("start.sh"):
         print("✅ start.sh存在")
     else:
         print("❌ 缺少start.sh")
         scripts_exist = False
 
-    if os.path.exists("start.bat"):
+    if path_exists("start.bat"):
         print("✅ start.bat存在")
     else:
         print("❌ 缺少start.bat")
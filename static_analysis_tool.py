@@ -9,36 +9,275 @@ import ast
 import re
 import json
 
+from bisect import bisect_right
+
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+
 from pathlib import Path
 
 from typing import Dict, List, Any
 
 from datetime import datetime
 
+# 尝试导入orjson（更快的JSON序列化），不可用时回退到标准库json
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 文件数达到该值时才使用多进程分析（进程启动开销高于小项目的分析耗时）
+PARALLEL_MIN_FILES = 32
+
+
+def _line_starts(content):
+    """计算每一行在文件内容中的起始偏移（与按换行符拆分得到的各行一一对应）"""
+    return [0, *(match.end() for match in re.finditer('\n', content))]
+
+
+def _matching_lines(regex, content, line_starts):
+    """在整个文件内容上搜索，按顺序生成有命中的行号（从0开始），命中后直接从下一行继续"""
+    pos = 0
+    last_line = len(line_starts) - 1
+
+    while True:
+        match = regex.search(content, pos)
+        if match is None:
+            return
+
+        line_index = bisect_right(line_starts, match.start()) - 1
+        yield line_index
+
+        if line_index == last_line:
+            return
+        pos = line_starts[line_index + 1]
+
+
+def _all_exports(node):
+    """返回__all__定义（赋值、+=、extend()/append()调用）中列出的名称"""
+    if isinstance(node, ast.Assign):
+        if not any(isinstance(target, ast.Name) and target.id == '__all__' for target in node.targets):
+            return ()
+        values = [node.value]
+    elif isinstance(node, ast.AugAssign):
+        if not (isinstance(node.target, ast.Name) and node.target.id == '__all__'):
+            return ()
+        values = [node.value]
+    else:
+        func = node.func
+        if not (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+                and func.value.id == '__all__'):
+            return ()
+        values = node.args
+
+    return [
+        item.value for value in values for item in ast.walk(value)
+        if isinstance(item, ast.Constant) and isinstance(item.value, str)
+    ]
+
 
 class CodeQualityAnalyzer:
     """代码质量分析器"""
 
+    # 扫描时跳过的目录
+    EXCLUDED_DIRS = frozenset({'__pycache__', '.git', 'venv', 'env'})
+
+    # 安全问题模式：(模式, 描述, 严重程度)，在类定义时编译一次
+    SECURITY_PATTERNS = [
+        (re.compile(pattern), description, severity)
+        for pattern, description, severity in [
+            (r'eval\s*\(', 'eval()函数使用', 'high'),
+            (r'exec\s*\(', 'exec()函数使用', 'high'),
+            (r'os\.system\s*\(', 'os.system()使用', 'high'),
+            (r'subprocess.*shell\s*=\s*True', 'shell=True使用', 'medium'),
+            (r'pickle\.loads?\s*\(', 'pickle反序列化', 'medium'),
+            (r'yaml\.load\s*\(', 'yaml.load()使用', 'medium'),
+        ]
+    ]
+
+    # 全部安全模式合并为一个零宽前瞻分支正则，在整个文件上搜索找出候选行，
+    # 候选行再逐个模式确认（合并正则在同一位置只报告第一个分支，不能直接用来分派）
+    SECURITY_PREFILTER = re.compile(
+        '(?=' + '|'.join(f'(?:{pattern.pattern})' for pattern, _, _ in SECURITY_PATTERNS) + ')'
+    )
+
+
+    # 风格检查：去掉行尾空白后仍超过88字符的行（第89个字符之后还有非空白字符），
+    # 以及行尾为空白字符的行；多行模式下在整个文件上各扫描一次
+    LONG_LINE_RE = re.compile(r'^[^\n]{88}[^\n]*\S', re.MULTILINE)
+    TRAILING_WHITESPACE_RE = re.compile(r'[^\S\n]$', re.MULTILINE)
+
 
     def __init__(self):
         self.project_root = Path(".")
         self.python_files = []
         self.results = {}
+        self._file_results = None
 
 
     def scan_files(self):
         """扫描Python文件"""
         print("🔍 扫描Python文件...")
 
-        exclude_patterns = ['__pycache__', '.git', 'venv', 'env']
-
-        for file_path in self.project_root.rglob("*.py"):
-            if not any(pattern in str(file_path) for pattern in exclude_patterns):
-                self.python_files.append(file_path)
+        # 遍历时直接剪掉排除的目录，不再进入缓存、版本库和虚拟环境目录逐个检查文件
+        for dir_path, dir_names, file_names in os.walk(self.project_root):
+            dir_names[:] = [name for name in dir_names if name not in self.EXCLUDED_DIRS]
+            self.python_files.extend(
+                Path(dir_path) / file_name for file_name in file_names if file_name.endswith('.py')
+            )
 
         print(f"📁 找到 {len(self.python_files)} 个Python文件")
 
 
+    @classmethod
+    def _analyze_file(cls, file_path) -> Dict[str, Any]:
+        """
+        读取单个文件一次、解析一次语法树，完成复杂度、安全、风格和导入全部检查
+
+        Returns:
+            该文件各项检查的结果（条目为元组，汇总时再转换为报告使用的字典）
+        """
+        file_result = {"error": None, "syntax_error": None}
+
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            file_result["error"] = str(e)
+            return file_result
+
+        # 文本模式读取已统一换行符，按\n分行即可得到与readlines()相同的行
+        lines = content.split('\n')
+        file_result["lines"] = len(lines)
+
+        try:
+            tree = ast.parse(content)
+        except SyntaxError as e:
+            file_result["syntax_error"] = str(e)
+            tree = None
+
+        if tree is not None:
+            file_result["functions"], file_result["complex_functions"] = cls._complexity_for(tree)
+            file_result["imports"] = cls._imports_for(tree)
+
+        # 行起始偏移只计算一次，安全检查和风格检查共用
+        line_starts = _line_starts(content)
+        file_result["security"] = cls._security_for(content, lines, line_starts)
+        file_result["style"] = cls._style_for(content, line_starts)
+
+        return file_result
+
+
+    @staticmethod
+    def _complexity_for(tree):
+        """统计函数数量，找出超过50行的函数"""
+        functions = 0
+        complex_functions = []
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.FunctionDef):
+                functions += 1
+
+                func_length = node.end_lineno - node.lineno + 1
+                if func_length > 50:
+                    complex_functions.append((node.name, func_length, node.lineno))
+
+        return functions, complex_functions
+
+
+    @classmethod
+    def _security_for(cls, content, lines, line_starts):
+        """在整个文件上预筛选候选行，只对候选行逐个模式确认安全问题（跳过注释行）"""
+        security_issues = []
+
+        for i in _matching_lines(cls.SECURITY_PREFILTER, content, line_starts):
+            line = lines[i]
+            stripped_line = line.strip()
+            if stripped_line.startswith('#'):
+                continue
+
+            for pattern, description, severity in cls.SECURITY_PATTERNS:
+                if pattern.search(line):
+                    security_issues.append((i + 1, stripped_line, description, severity))
+
+        return security_issues
+
+
+    @classmethod
+    def _style_for(cls, content, line_starts):
+        """在整个文件上查找过长的行和行尾空格，按行号顺序返回"""
+        # 命中位置之前的行起始数即为行号（从1开始）
+        long_lines = {
+            bisect_right(line_starts, match.start())
+            for match in cls.LONG_LINE_RE.finditer(content)
+        }
+        trailing_lines = {
+            bisect_right(line_starts, match.start())
+            for match in cls.TRAILING_WHITESPACE_RE.finditer(content)
+        }
+
+        style_issues = []
+        for line_number in sorted(long_lines | trailing_lines):
+            if line_number in long_lines:
+                style_issues.append((line_number, "行长度超过88字符", "line_length"))
+            if line_number in trailing_lines:
+                style_issues.append((line_number, "行尾有多余空格", "trailing_whitespace"))
+
+        return style_issues
+
+
+    @staticmethod
+    def _imports_for(tree):
+        """
+        检查未使用的导入：一次遍历语法树，收集导入绑定的名称和代码中引用的名称
+        （包括__all__中导出的名称），导入绑定的名称都未被引用时视为未使用
+        """
+        imports = []
+        used_names = set()
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                used_names.add(node.id)
+            elif isinstance(node, ast.Attribute):
+                used_names.add(node.attr)
+            elif isinstance(node, ast.Import):
+                # import a.b 绑定a，import a.b as c 绑定c
+                for alias in node.names:
+                    imports.append((alias.name, (alias.asname or alias.name.split('.')[0],)))
+            elif isinstance(node, ast.ImportFrom):
+                # 星号导入无法判断使用了哪些名称，不做检查
+                if node.module and all(alias.name != '*' for alias in node.names):
+                    imports.append((node.module, tuple(alias.asname or alias.name for alias in node.names)))
+            elif isinstance(node, (ast.Assign, ast.AugAssign, ast.Call)):
+                used_names.update(_all_exports(node))
+
+        return [
+            imp for imp, bound_names in imports
+            if not any(name in used_names for name in bound_names)
+        ]
+
+
+    def _analyze_files(self):
+        """分析所有文件（每个文件只读取一次），文件较多时分发到多个进程并行处理"""
+        if self._file_results is not None:
+            return self._file_results
+
+        file_results = None
+        if len(self.python_files) >= PARALLEL_MIN_FILES and (os.cpu_count() or 1) > 1:
+            try:
+                with ProcessPoolExecutor() as pool:
+                    file_results = list(pool.map(analyze_file, self.python_files, chunksize=16))
+            except (OSError, BrokenExecutor) as e:
+                print(f"⚠️ 多进程分析不可用，改为顺序分析: {e}")
+
+        if file_results is None:
+            file_results = [self._analyze_file(file_path) for file_path in self.python_files]
+
+        self._file_results = file_results
+        return file_results
+
+
     def analyze_complexity(self):
         """分析代码复杂度"""
         print("\n🔧 分析代码复杂度...")
@@ -48,47 +287,30 @@ class CodeQualityAnalyzer:
         total_functions = 0
         complex_functions = []
 
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                lines = len(content.split('\n'))
-                total_lines += lines
-
-                try:
-                    tree = ast.parse(content)
-
-                    file_functions = 0
-                    file_complex = []
-
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.FunctionDef):
-                            file_functions += 1
-                            total_functions += 1
-
-                            func_length = node.end_lineno - node.lineno + 1
-                            if func_length > 50:
-                                complex_func = {
-                                    "file": str(file_path),
-                                    "function": node.name,
-                                    "length": func_length,
-                                    "line": node.lineno
-                                }
-                                file_complex.append(complex_func)
-                                complex_functions.append(complex_func)
-
-                    complexity_results[str(file_path)] = {
-                        "lines": lines,
-                        "functions": file_functions,
-                        "complex_functions": file_complex
-                    }
-
-                except SyntaxError as e:
-                    print(f"⚠️ 语法错误 {file_path}: {e}")
-
-            except Exception as e:
-                print(f"⚠️ 分析失败 {file_path}: {e}")
+        for file_path, file_result in zip(self.python_files, self._analyze_files()):
+            if file_result["error"] is not None:
+                print(f"⚠️ 分析失败 {file_path}: {file_result['error']}")
+                continue
+
+            total_lines += file_result["lines"]
+
+            if file_result["syntax_error"] is not None:
+                print(f"⚠️ 语法错误 {file_path}: {file_result['syntax_error']}")
+                continue
+
+            path_str = str(file_path)
+            file_complex = [
+                {"file": path_str, "function": name, "length": length, "line": lineno}
+                for name, length, lineno in file_result["complex_functions"]
+            ]
+            total_functions += file_result["functions"]
+            complex_functions.extend(file_complex)
+
+            complexity_results[path_str] = {
+                "lines": file_result["lines"],
+                "functions": file_result["functions"],
+                "complex_functions": file_complex
+            }
 
         self.results["complexity"] = {
             "total_lines": total_lines,
@@ -106,35 +328,18 @@ class CodeQualityAnalyzer:
         """检查安全问题"""
         print("\n🛡️ 检查安全问题...")
 
-        security_patterns = [
-            (r'eval\s*\(', 'eval()函数使用', 'high'),
-            (r'exec\s*\(', 'exec()函数使用', 'high'),
-            (r'os\.system\s*\(', 'os.system()使用', 'high'),
-            (r'subprocess.*shell\s*=\s*True', 'shell=True使用', 'medium'),
-            (r'pickle\.loads?\s*\(', 'pickle反序列化', 'medium'),
-            (r'yaml\.load\s*\(', 'yaml.load()使用', 'medium'),
-        ]
-
         security_issues = []
 
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-
-                for i, line in enumerate(lines, 1):
-                    for pattern, description, severity in security_patterns:
-                        if re.search(pattern, line) and not line.strip().startswith('#'):
-                            security_issues.append({
-                                "file": str(file_path),
-                                "line": i,
-                                "code": line.strip(),
-                                "issue": description,
-                                "severity": severity
-                            })
-
-            except Exception as e:
-                print(f"⚠️ 安全检查失败 {file_path}: {e}")
+        for file_path, file_result in zip(self.python_files, self._analyze_files()):
+            if file_result["error"] is not None:
+                print(f"⚠️ 安全检查失败 {file_path}: {file_result['error']}")
+                continue
+
+            path_str = str(file_path)
+            security_issues.extend(
+                {"file": path_str, "line": line, "code": code, "issue": description, "severity": severity}
+                for line, code, description, severity in file_result["security"]
+            )
 
         # 按严重程度分组
         by_severity = {"high": [], "medium": [], "low": []}
@@ -164,32 +369,16 @@ class CodeQualityAnalyzer:
 
         style_issues = []
 
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-
-                for i, line in enumerate(lines, 1):
-                    # 检查行长度
-                    if len(line.rstrip()) > 88:
-                        style_issues.append({
-                            "file": str(file_path),
-                            "line": i,
-                            "issue": "行长度超过88字符",
-                            "type": "line_length"
-                        })
-
-                    # 检查尾随空格
-                    if line.rstrip() != line.rstrip('\n'):
-                        style_issues.append({
-                            "file": str(file_path),
-                            "line": i,
-                            "issue": "行尾有多余空格",
-                            "type": "trailing_whitespace"
-                        })
-
-            except Exception as e:
-                print(f"⚠️ 风格检查失败 {file_path}: {e}")
+        for file_path, file_result in zip(self.python_files, self._analyze_files()):
+            if file_result["error"] is not None:
+                print(f"⚠️ 风格检查失败 {file_path}: {file_result['error']}")
+                continue
+
+            path_str = str(file_path)
+            style_issues.extend(
+                {"file": path_str, "line": line, "issue": issue, "type": issue_type}
+                for line, issue, issue_type in file_result["style"]
+            )
 
         self.results["style"] = {
             "issues": style_issues,
@@ -205,43 +394,17 @@ class CodeQualityAnalyzer:
 
         import_issues = []
 
-        for file_path in self.python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                try:
-                    tree = ast.parse(content)
-
-                    imports = []
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.Import):
-                            for alias in node.names:
-                                imports.append(alias.name)
-                        elif isinstance(node, ast.ImportFrom):
-                            if node.module:
-                                imports.append(node.module)
-
-                    # 简单检查未使用的导入
-                    for imp in imports:
-                        module_name = imp.split('.')[0]
-                        if module_name not in content.replace(f"import {imp}", ""):
-
-                            # 更精确的检查
-                            if not re.search(rf'\b{re.escape(module_name)}\b',
-                                           content.replace(f"import {imp}", "")):
-
-                                import_issues.append({
-                                    "file": str(file_path),
-                                    "import": imp,
-                                    "issue": "可能未使用的导入"
-                                })
-
-                except SyntaxError:
-                    pass
-
-            except Exception as e:
-                print(f"⚠️ 导入检查失败 {file_path}: {e}")
+        for file_path, file_result in zip(self.python_files, self._analyze_files()):
+            if file_result["error"] is not None:
+                print(f"⚠️ 导入检查失败 {file_path}: {file_result['error']}")
+                continue
+
+            # 存在语法错误的文件不检查导入
+            path_str = str(file_path)
+            import_issues.extend(
+                {"file": path_str, "import": imp, "issue": "可能未使用的导入"}
+                for imp in file_result.get("imports", ())
+            )
 
         self.results["imports"] = {
             "issues": import_issues,
@@ -310,8 +473,13 @@ class CodeQualityAnalyzer:
             "total_files": len(self.python_files)
         }
 
-        with open("code_quality_report.json", "w", encoding="utf-8") as f:
-            json.dump(self.results, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            Path("code_quality_report.json").write_bytes(
+                orjson.dumps(self.results, option=orjson.OPT_INDENT_2)
+            )
+        else:
+            with open("code_quality_report.json", "w", encoding="utf-8") as f:
+                json.dump(self.results, f, indent=2, ensure_ascii=False)
 
         print(f"\n💾 详细报告已保存到: code_quality_report.json")
 
@@ -328,6 +496,11 @@ class CodeQualityAnalyzer:
         return self.generate_report()
 
 
+def analyze_file(file_path):
+    """在工作进程中分析单个文件"""
+    return CodeQualityAnalyzer._analyze_file(file_path)
+
+
 def main():
     analyzer = CodeQualityAnalyzer()
     return analyzer.run_analysis()
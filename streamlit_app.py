@@ -4,13 +4,14 @@ Streamlit Cloud专用应用
 简化版智能多模态AI Agent - 只包含核心功能
 """
 
+import io
+import json
 import os
 import streamlit as st
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-from openai import OpenAI
-
 # 页面配置
 st.set_page_config(
     page_title="智能AI助手",
@@ -19,6 +20,32 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 对话系统提示（模块加载时创建一次，每轮对话直接复用）
+SYSTEM_MESSAGE = {"role": "system", "content": "你是一个智能、友好、有帮助的AI助手。请用中文回答问题，回答要准确、简洁、有条理。"}
+
+# 会话中保留的最大消息数，避免session_state随对话无限增长
+MAX_HISTORY_MESSAGES = 40
+
+# 文件预览字符数，以及送入AI处理的最大字符数
+PREVIEW_CHARS = 1000
+MAX_CONTENT_CHARS = 2000
+
+# 文本处理支持的操作及生成参数
+TEXT_ACTIONS = ("总结", "分析")
+TEXT_MAX_TOKENS = 1000
+TEXT_TEMPERATURE = 0.3
+
+# AI响应缓存有效期（秒）
+RESPONSE_CACHE_TTL = 3600
+
+# 尝试导入缓存管理器，相同的文本处理请求在有效期内直接复用结果
+try:
+    from performance.cache_manager import CacheManager
+
+    RESPONSE_CACHE_AVAILABLE = True
+except ImportError:
+    RESPONSE_CACHE_AVAILABLE = False
+
 
 def check_api_keys():
     """检查并设置API密钥"""
@@ -46,6 +73,53 @@ def check_api_keys():
         return None
 
 
+@st.cache_resource(show_spinner=False)
+def create_client(api_type):
+    """创建进程级共享的AI客户端（脚本重跑时不再重复创建）"""
+    # 延迟导入openai，页面首屏渲染不必等待SDK加载
+    from openai import OpenAI
+
+    if api_type == "ark":
+        client = OpenAI(
+            base_url=os.getenv("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3"),
+            api_key=os.getenv("ARK_API_KEY"),
+        )
+        model = os.getenv("ARK_MODEL", "ep-20250506230532-w7rdw")
+        api_name = "火山方舟API"
+    else:
+        client = OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+        )
+        model = "gpt-3.5-turbo"
+        api_name = "OpenAI API"
+
+    return client, model, api_name
+
+
+@st.cache_resource(show_spinner=False)
+def get_response_cache():
+    """创建进程级共享的AI响应缓存（所有会话共用，脚本重跑时保留）"""
+    if not RESPONSE_CACHE_AVAILABLE:
+        return None
+    return CacheManager(max_size=1024, default_ttl=RESPONSE_CACHE_TTL)
+
+
+def get_cached_text(cache, model, messages):
+    """按(模型, 消息, 生成参数)查找已缓存的处理结果"""
+    if cache is None:
+        return None
+    prompt = json.dumps(messages, ensure_ascii=False, sort_keys=True)
+    return cache.get_cached_response(prompt, model, TEXT_TEMPERATURE, TEXT_MAX_TOKENS)
+
+
+def cache_text(cache, model, messages, result):
+    """缓存完整的处理结果（空结果不缓存）"""
+    if cache is None or not result:
+        return
+    prompt = json.dumps(messages, ensure_ascii=False, sort_keys=True)
+    cache.cache_response(prompt, model, TEXT_TEMPERATURE, TEXT_MAX_TOKENS, result, ttl=RESPONSE_CACHE_TTL)
+
+
 def init_client():
     """初始化AI客户端"""
     api_type = check_api_keys()
@@ -72,26 +146,16 @@ def init_client():
         return None, None, None
 
     try:
-        if api_type == "ark":
-            client = OpenAI(
-                base_url=os.getenv("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3"),
-                api_key=os.getenv("ARK_API_KEY"),
-            )
-            model = os.getenv("ARK_MODEL", "ep-20250506230532-w7rdw")
-            api_name = "火山方舟API"
-        else:
-            client = OpenAI(
-                api_key=os.getenv("OPENAI_API_KEY"),
+        client, model, api_name = create_client(api_type)
+
+        # 测试连接（每个会话成功一次后不再重复测试）
+        if not st.session_state.get("api_connection_ok"):
+            client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": "你好"}],
+                max_tokens=10
             )
-            model = "gpt-3.5-turbo"
-            api_name = "OpenAI API"
-
-        # 测试连接
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": "你好"}],
-            max_tokens=10
-        )
+            st.session_state.api_connection_ok = True
 
         return client, model, api_name
 
@@ -100,6 +164,14 @@ def init_client():
         return None, None, None
 
 
+def append_message(role, content):
+    """添加消息到历史，超出上限时原地丢弃最早的消息"""
+    messages = st.session_state.messages
+    messages.append({"role": role, "content": content})
+    if len(messages) > MAX_HISTORY_MESSAGES:
+        del messages[:-MAX_HISTORY_MESSAGES]
+
+
 def chat_interface(client, model):
     """智能对话界面"""
     # 初始化对话历史
@@ -128,41 +200,52 @@ def chat_interface(client, model):
     # 用户输入
     if prompt := st.chat_input("请输入您的问题..."):
         # 添加用户消息
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        append_message("user", prompt)
         with st.chat_message("user"):
             st.markdown(prompt)
 
         # 生成AI回复
         with st.chat_message("assistant"):
-            with st.spinner("🤔 AI正在思考..."):
-                try:
-                    # 构建消息历史
-                    messages = [
-                        {"role": "system", "content": "你是一个智能、友好、有帮助的AI助手。请用中文回答问题，回答要准确、简洁、有条理。"}
-                    ]
-
-                    # 添加最近的对话历史
-                    recent_messages = st.session_state.messages[-8:]
-                    for msg in recent_messages:
-                        messages.append({"role": msg["role"], "content": msg["content"]})
+            response_placeholder = st.empty()
+            assistant_response = ""
 
+            try:
+                # 构建消息历史：系统提示 + 最近的对话历史，一次性构建列表
+                messages = [
+                    SYSTEM_MESSAGE,
+                    *({"role": msg["role"], "content": msg["content"]}
+                      for msg in st.session_state.messages[-8:])
+                ]
+
+                with st.spinner("🤔 AI正在思考..."):
                     response = client.chat.completions.create(
                         model=model,
                         messages=messages,
                         max_tokens=1500,
-                        temperature=0.7
+                        temperature=0.7,
+                        stream=True
                     )
 
-                    assistant_response = response.choices[0].message.content
-                    st.markdown(assistant_response)
+                # 流式显示回复，首个token到达即开始渲染
+                for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content is not None:
+                        assistant_response += chunk.choices[0].delta.content
+                        response_placeholder.markdown(assistant_response + "▌")
 
-                    # 添加助手消息
-                    st.session_state.messages.append({"role": "assistant", "content": assistant_response})
+                response_placeholder.markdown(assistant_response)
 
-                except Exception as e:
-                    error_msg = f"抱歉，处理您的请求时出现错误: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                # 添加助手消息
+                append_message("assistant", assistant_response)
+
+            except Exception as e:
+                error_msg = f"抱歉，处理您的请求时出现错误: {str(e)}"
+                st.error(error_msg)
+
+                # 保留已经流式输出的部分内容
+                if assistant_response:
+                    response_placeholder.markdown(assistant_response)
+                    error_msg = f"{assistant_response}\n\n{error_msg}"
+                append_message("assistant", error_msg)
 
 
 def file_interface(client, model):
@@ -194,18 +277,26 @@ def file_interface(client, model):
         # 处理文本文件
         if uploaded_file.type.startswith('text/') or uploaded_file.name.endswith(('.md', '.csv')):
             try:
-                content = uploaded_file.read().decode('utf-8')
+                # 只流式解码需要用到的前缀（多读一个字符用于判断是否截断），避免整个文件读入内存
+                reader = io.TextIOWrapper(uploaded_file, encoding='utf-8')
+                try:
+                    content = reader.read(MAX_CONTENT_CHARS + 1)
+                finally:
+                    reader.detach()
+                truncated = len(content) > MAX_CONTENT_CHARS
+                content = content[:MAX_CONTENT_CHARS]
 
                 # 文件预览
                 st.markdown("#### 👀 文件预览")
-                preview_length = min(1000, len(content))
-                st.text_area("内容预览", content[:preview_length], height=150, disabled=True)
-                if len(content) > 1000:
-                    st.caption(f"显示前1000字符，总长度: {len(content)}字符")
+                st.text_area("内容预览", content[:PREVIEW_CHARS], height=150, disabled=True)
+                if truncated:
+                    st.caption(f"显示前{PREVIEW_CHARS}字符，AI处理将使用前{MAX_CONTENT_CHARS}字符")
+                elif len(content) > PREVIEW_CHARS:
+                    st.caption(f"显示前{PREVIEW_CHARS}字符，总长度: {len(content)}字符")
 
                 # AI处理选项
                 st.markdown("#### 🔧 AI处理选项")
-                col1, col2 = st.columns(2)
+                col1, col2, col3 = st.columns(3)
 
                 with col1:
                     if st.button("📝 总结内容", use_container_width=True):
@@ -215,6 +306,13 @@ def file_interface(client, model):
                     if st.button("🔍 分析内容", use_container_width=True):
                         process_text(content, client, model, "分析")
 
+                with col3:
+                    analyze_all = st.button("🧩 总结并分析", use_container_width=True)
+
+                # 两项结果在按钮列下方整宽显示
+                if analyze_all:
+                    process_text_all(content, client, model)
+
             except Exception as e:
                 st.error(f"无法读取文件: {e}")
 
@@ -228,33 +326,108 @@ def file_interface(client, model):
             st.info("📋 当前版本主要支持文本文件的AI分析")
 
 
+def build_text_messages(content, action):
+    """构建文本处理请求的消息列表"""
+    if action == "总结":
+        prompt = f"请总结以下文本的主要内容，要点清晰、简洁明了：\n\n{content[:MAX_CONTENT_CHARS]}"
+    else:
+        prompt = f"请分析以下文本的内容、结构、主题和要点：\n\n{content[:MAX_CONTENT_CHARS]}"
+
+    return [
+        {"role": "system", "content": f"你是一个专业的文档分析助手，请对用户提供的文本进行{action}，回答要有条理、准确、有用。"},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def request_text_action(messages, client, model):
+    """调用AI处理文本，返回结果文本（不涉及界面渲染，可在线程中调用）"""
+    response = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=TEXT_MAX_TOKENS,
+        temperature=TEXT_TEMPERATURE
+    )
+
+    return response.choices[0].message.content
+
+
 def process_text(content, client, model, action):
-    """处理文本内容"""
+    """处理文本内容（流式显示结果，命中缓存时直接显示）"""
     try:
-        if action == "总结":
-            prompt = f"请总结以下文本的主要内容，要点清晰、简洁明了：\n\n{content[:2000]}"
-        else:
-            prompt = f"请分析以下文本的内容、结构、主题和要点：\n\n{content[:2000]}"
+        messages = build_text_messages(content, action)
+        cache = get_response_cache()
+
+        st.markdown(f"#### 📋 {action}结果")
+
+        cached_result = get_cached_text(cache, model, messages)
+        if cached_result is not None:
+            st.markdown(cached_result)
+            return
+
+        result_placeholder = st.empty()
 
         with st.spinner(f"🤔 AI正在{action}内容..."):
             response = client.chat.completions.create(
                 model=model,
-                messages=[
-                    {"role": "system", "content": f"你是一个专业的文档分析助手，请对用户提供的文本进行{action}，回答要有条理、准确、有用。"},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.3
+                messages=messages,
+                max_tokens=TEXT_MAX_TOKENS,
+                temperature=TEXT_TEMPERATURE,
+                stream=True
             )
 
-            result = response.choices[0].message.content
-            st.markdown(f"#### 📋 {action}结果")
-            st.markdown(result)
+        # 首个token到达即开始渲染，不必等待完整回复
+        result = ""
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content is not None:
+                result += chunk.choices[0].delta.content
+                result_placeholder.markdown(result + "▌")
+
+        result_placeholder.markdown(result)
+        cache_text(cache, model, messages, result)
 
     except Exception as e:
         st.error(f"处理内容时出错: {e}")
 
 
+def process_text_all(content, client, model):
+    """并发执行所有文本处理操作，哪个先返回就先显示哪个"""
+    cache = get_response_cache()
+    pending = {}
+
+    # 已缓存的结果直接显示，只为未命中的操作发出请求
+    for action in TEXT_ACTIONS:
+        messages = build_text_messages(content, action)
+        cached_result = get_cached_text(cache, model, messages)
+        if cached_result is None:
+            pending[action] = messages
+            continue
+
+        st.markdown(f"#### 📋 {action}结果")
+        st.markdown(cached_result)
+
+    if not pending:
+        return
+
+    # 请求以网络等待为主，用线程并发发出；界面渲染和缓存写入仍在脚本主线程中进行
+    with st.spinner("🤔 AI正在同时总结和分析内容..."):
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {
+                executor.submit(request_text_action, messages, client, model): action
+                for action, messages in pending.items()
+            }
+            for future in as_completed(futures):
+                action = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    st.error(f"{action}内容时出错: {e}")
+                    continue
+
+                cache_text(cache, model, pending[action], result)
+                st.markdown(f"#### 📋 {action}结果")
+                st.markdown(result)
+
+
 def main():
     """主函数"""
     st.title("🤖 智能AI助手")
@@ -278,6 +451,12 @@ def main():
             st.session_state.messages = []
             st.rerun()
 
+        # 清除AI响应缓存
+        response_cache = get_response_cache()
+        if response_cache is not None and st.button("🧹 清除缓存", use_container_width=True):
+            cleared = response_cache.clear()
+            st.success(f"已清除 {cleared} 条缓存结果")
+
         # 使用说明
         st.markdown("---")
         st.markdown("**💬 智能对话**: 与AI助手自由交流")
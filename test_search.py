@@ -6,6 +6,8 @@ import asyncio
 import sys
 import os
 
+from importlib.util import find_spec
+
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -120,11 +122,11 @@ def test_dependencies():
     ]
     
     missing = []
+    # 只查找模块规格判断是否安装，不执行包的初始化代码
     for name, module in dependencies:
-        try:
-            __import__(module)
+        if find_spec(module) is not None:
             print(f"  ✅ {name}")
-        except ImportError:
+        else:
             print(f"  ❌ {name} (未安装)")
             missing.append(name)
     
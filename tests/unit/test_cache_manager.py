@@ -0,0 +1,28 @@
+"""
+AI响应缓存测试
+"""
+
+from performance.cache_manager import CacheManager
+
+
+def test_cached_response_hit_and_miss():
+    """测试精确匹配命中与未命中"""
+    cache = CacheManager()
+    assert cache.get_cached_response("你好", "model", 0.3, 100) is None
+
+    cache.cache_response("你好", "model", 0.3, 100, "回答")
+    assert cache.get_cached_response("你好", "model", 0.3, 100) == "回答"
+    assert cache.get_cached_response("你好", "model", 0.7, 100) is None
+
+
+def test_each_lookup_counts_once():
+    """测试每次查找只计一次请求"""
+    cache = CacheManager()
+    cache.get_cached_response("a", "model", 0.3, 100)
+    cache.cache_response("a", "model", 0.3, 100, "r")
+    cache.get_cached_response("a", "model", 0.3, 100)
+
+    stats = cache.get_stats()
+    assert stats['total_requests'] == 2
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
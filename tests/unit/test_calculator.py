@@ -0,0 +1,40 @@
+"""
+计算工具表达式求值测试
+"""
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from multimodal_agent.tools.calculator import _evaluate_node, _parse_expression
+
+
+def evaluate(expression: str):
+    return _evaluate_node(_parse_expression(expression))
+
+
+def test_basic_arithmetic():
+    """测试基本运算"""
+    assert evaluate("1 + 2 * 3") == 7
+    assert evaluate("2 ** 10") == 1024
+    assert evaluate("-(4 / 2)") == -2.0
+
+
+def test_large_exponent_rejected():
+    """测试指数过大时拒绝计算"""
+    with pytest.raises(ValueError):
+        evaluate("2 ** 100000")
+
+
+def test_nested_power_rejected():
+    """测试嵌套幂运算在计算前被拒绝，不会卡住"""
+    with pytest.raises(ValueError):
+        evaluate("((9 ** 999) ** 999) ** 999")
+    with pytest.raises(ValueError):
+        evaluate("(9 ** 999) ** 999")
+
+
+def test_float_power_rejected():
+    """测试浮点数幂运算走同样的检查"""
+    with pytest.raises(ValueError):
+        evaluate("(9.5 ** 300) ** 999")
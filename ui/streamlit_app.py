@@ -11,6 +11,14 @@ from datetime import datetime
 
 from typing import Dict, Any
 
+# 尝试导入orjson（更快的JSON序列化），不可用时回退到st.json
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -24,6 +32,21 @@ logger = logging.getLogger(__name__)
 
 # 页面配置已在app.py中设置，这里不再重复设置
 
+
+def render_json(data: Any):
+    """渲染JSON数据（orjson可用时直接序列化为代码块）"""
+    if ORJSON_AVAILABLE:
+        try:
+            text = orjson.dumps(
+                data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str
+            ).decode()
+            st.code(text, language="json")
+            return
+        except TypeError:
+            pass
+    st.json(data)
+
+
 # 初始化会话状态
 @st.cache_resource
 
@@ -66,7 +89,7 @@ def main():
         # Agent状态
         if st.button("📊 查看Agent状态"):
             status = st.session_state.agent.get_status()
-            st.json(status)
+            render_json(status)
 
         # 清除记忆
         if st.button("🗑️ 清除记忆"):
@@ -77,8 +100,7 @@ def main():
         # 工具信息
         st.subheader("🔧 可用工具")
         tools = st.session_state.agent.tool_manager.get_tool_names()
-        for tool in tools:
-            st.text(f"• {tool}")
+        st.text("\n".join(f"• {tool}" for tool in tools))
 
     # 主界面标签页
     tab1, tab2, tab3, tab4 = st.tabs(["💬 对话", "📁 文件处理", "🖼️ 图像处理", "📊 数据分析"])
@@ -105,8 +127,7 @@ def chat_interface():
         st.subheader("对话历史")
         for i, conv in enumerate(st.session_state.conversation_history):
             with st.expander(f"对话 {i+1} - {conv['timestamp']}", expanded=(i == len(st.session_state.conversation_history)-1)):
-                st.markdown(f"**用户:** {conv['user_input']}")
-                st.markdown(f"**Agent:** {conv['agent_response']}")
+                st.markdown(f"**用户:** {conv['user_input']}\n\n**Agent:** {conv['agent_response']}")
                 if 'processing_time' in conv:
                     st.caption(f"处理时间: {conv['processing_time']:.2f}秒")
 
@@ -268,7 +289,7 @@ def search_memory(query: str):
                     with st.expander(f"结果 {i+1}"):
                         st.text(result.page_content)
                         if result.metadata:
-                            st.json(result.metadata)
+                            render_json(result.metadata)
             else:
                 st.info("未找到相关记忆")
 